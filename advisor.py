@@ -0,0 +1,81 @@
+# Streamlit Advisor Analytics
+# ------------------------------------------------------------------------
+# streamlit run advisor.py
+#
+# Reads only the aggregate tables maintained by risk_core.analytics, so the
+# page loads in constant time however many submissions have been stored.
+import streamlit as st
+from risk_core import analytics, store
+from risk_core.scoring import LEVELS
+
+st.set_page_config(page_title="Advisor Analytics", page_icon="📈", layout="wide")
+
+
+@st.cache_resource
+def get_connection():
+    return store.connect(store.DB_PATH)
+
+
+data = analytics.dashboard(get_connection())
+
+st.title("📈 Advisor Analytics")
+if not data["submissions"]:
+    st.info("No completed questionnaires have been stored yet.")
+    st.stop()
+
+days = data["daily"]
+last = days[-1]
+col1, col2, col3 = st.columns(3)
+col1.metric("Completed questionnaires", f"{data['submissions']:,}")
+mismatched = sum(d["tolerance_above"] + d["capacity_above"] for d in days)
+col2.metric("Tolerance / capacity mismatch", f"{mismatched / data['submissions']:.1%}")
+col3.metric(f"Submissions on {last['day']}", f"{last['submissions']:,}")
+
+# --- Level mix ------------------------------------------------------------------
+st.header("Risk levels")
+levels = data["levels"]
+st.bar_chart(
+    {
+        "Risk Tolerance": [levels["tol"].get(level, 0) for level in LEVELS],
+        "Risk Capacity": [levels["cap"].get(level, 0) for level in LEVELS],
+        "Overall (combine_label)": [levels["overall"].get(level, 0) for level in LEVELS],
+    },
+    x_label="Level (Conservative → Aggressive)",
+    stack=False,
+)
+
+# --- Score distributions --------------------------------------------------------
+st.header("Score distributions")
+totals = data["totals"]
+scores = list(range(8, 41))
+st.bar_chart(
+    {
+        "score": scores,
+        "Risk Tolerance": [totals["tol"].get(s, 0) for s in scores],
+        "Risk Capacity": [totals["cap"].get(s, 0) for s in scores],
+    },
+    x="score",
+    stack=False,
+)
+
+# --- Mismatch rate over time ----------------------------------------------------
+st.header("Tolerance / capacity mismatch by day")
+st.line_chart(
+    {
+        "day": [d["day"] for d in days],
+        "Tolerance above capacity": [d["tolerance_above"] / d["submissions"] for d in days],
+        "Capacity above tolerance": [d["capacity_above"] / d["submissions"] for d in days],
+    },
+    x="day",
+)
+
+# --- Per-question answers -------------------------------------------------------
+st.header("Answers per question")
+st.caption("Option 1 is the first (highest-scoring) answer shown to the client.")
+st.dataframe(
+    [
+        {"question": q, **{f"option {o + 1}": counts.get(o, 0) for o in range(5)}}
+        for q, counts in sorted(data["options"].items(), key=lambda kv: (kv[0][:3] != "tol", int(kv[0][4:])))
+    ],
+    hide_index=True,
+)
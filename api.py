@@ -0,0 +1,171 @@
+# Headless scoring and report API (Starlette, served by uvicorn)
+# ------------------------------------------------------------------------
+#   python api.py [--host 127.0.0.1] [--port 8600] [--workers 4]
+#   uvicorn api:app --port 8600
+#
+#   POST /score    {"tol": [0, 3, 1, ...], "cap": [...], "version": "2025.10"}
+#                  -> totals, levels, descriptions, overall_message, combine_label
+#   POST /report   the same plus "client_name" and "client_email" -> the PDF
+#   GET  /health
+#
+# Answers are option indices in question order (tol_0.., cap_0..), as stored by
+# the app; "version" defaults to the current questionnaire. Scoring is cheap and
+# runs on the event loop. PDF builds run on a process pool (RISK_API_WORKERS,
+# default one per CPU), so the loop never waits on ReportLab and builds use
+# every core. Finished reports go into the shared report cache, and identical
+# requests that arrive while one is being built share that build.
+import argparse
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from risk_core.questionnaire import QUESTIONNAIRE_VERSION, available_versions, load
+from risk_core.report import build_report, report_assets
+from risk_core.report_cache import report_cache, report_key
+from risk_core.scoring import score_answers
+
+WORKERS = int(os.environ.get("RISK_API_WORKERS", "0")) or os.cpu_count() or 1
+
+log = logging.getLogger(__name__)
+
+
+# --- Request parsing ----------------------------------------------------------------
+def parse_answers(body):
+    """(tol_idx, cap_idx, version) from a request body; raises ValueError if it is invalid."""
+    if not isinstance(body, dict):
+        raise ValueError("expected a JSON object")
+    version = body.get("version", QUESTIONNAIRE_VERSION)
+    if version not in available_versions():
+        raise ValueError(f"unknown questionnaire version {version!r}")
+    questionnaire = load(version)
+    answers = []
+    for key in ("tol", "cap"):
+        questions = questionnaire[key].questions
+        idx = body.get(key)
+        if not isinstance(idx, list) or len(idx) != len(questions):
+            raise ValueError(f"{key!r} must be a list of {len(questions)} option indices")
+        for n, (q, i) in enumerate(zip(questions, idx)):
+            if type(i) is not int or not 0 <= i < len(q.options):
+                raise ValueError(f"{key}[{n}] must be an option index from 0 to {len(q.options) - 1}")
+        answers.append(idx)
+    return answers[0], answers[1], version
+
+
+def parse_client(body):
+    client = []
+    for key in ("client_name", "client_email"):
+        value = body.get(key)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"{key!r} is required")
+        client.append(value)
+    return client
+
+
+async def _json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        raise ValueError("request body must be JSON") from None
+
+
+def _bad_request(exc):
+    return JSONResponse({"error": str(exc)}, status_code=400)
+
+
+# --- Endpoints ----------------------------------------------------------------------
+async def score(request):
+    try:
+        tol_idx, cap_idx, version = parse_answers(await _json(request))
+    except ValueError as exc:
+        return _bad_request(exc)
+    r = score_answers(tol_idx, cap_idx, version)
+    return JSONResponse({
+        "version": version,
+        "tol_total": r["tol_total"], "tol_level": r["tol_level"], "tol_description": r["tol_desc"],
+        "cap_total": r["cap_total"], "cap_level": r["cap_level"], "cap_description": r["cap_desc"],
+        "overall_message": r["message"],
+        "combine_label": r["overall_label"],
+    })
+
+
+async def report(request):
+    try:
+        body = await _json(request)
+        tol_idx, cap_idx, version = parse_answers(body)
+        client_name, client_email = parse_client(body)
+    except ValueError as exc:
+        return _bad_request(exc)
+
+    key = report_key(client_name, client_email, tol_idx, cap_idx, version)
+    pdf = report_cache.get(key)
+    if pdf is None:
+        builds = request.app.state.builds
+        build = builds.get(key)
+        if build is None:
+            build = builds[key] = asyncio.get_running_loop().run_in_executor(
+                request.app.state.pool, build_report, client_name, client_email, tol_idx, cap_idx, version)
+            build.add_done_callback(lambda done: _build_done(builds, key, done))
+        try:
+            # shield: a client hanging up must not cancel a build others are waiting for
+            pdf = await asyncio.shield(build)
+        except Exception:
+            log.exception("report build failed")
+            return JSONResponse({"error": "the report could not be built"}, status_code=500)
+    return Response(pdf, media_type="application/pdf",
+                    headers={"Content-Disposition": 'attachment; filename="Risk_Profile_Report.pdf"'})
+
+
+def _build_done(builds, key, build):
+    builds.pop(key, None)
+    if not build.cancelled() and build.exception() is None:
+        report_cache.put(key, build.result())
+
+
+async def health(request):
+    return JSONResponse({"status": "ok", "versions": available_versions()})
+
+
+# --- App ----------------------------------------------------------------------------
+def create_app(workers=WORKERS):
+    @asynccontextmanager
+    async def lifespan(app):
+        # Workers prepare the static report assets once, as in bulk_reports
+        app.state.pool = ProcessPoolExecutor(workers, initializer=report_assets)
+        app.state.builds = {}       # report key -> build in progress
+        try:
+            yield
+        finally:
+            app.state.pool.shutdown(cancel_futures=True)
+
+    return Starlette(
+        routes=[
+            Route("/score", score, methods=["POST"]),
+            Route("/report", report, methods=["POST"]),
+            Route("/health", health, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+app = create_app()
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Risk questionnaire scoring and report API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="PDF build processes")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.workers), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
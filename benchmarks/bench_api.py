@@ -0,0 +1,185 @@
+# Load test for the headless API (api.py) on localhost
+# ------------------------------------------------------------------------
+# Keeps `--concurrency` keep-alive connections busy for `--duration` seconds
+# per scenario and reports requests/s and latency percentiles:
+#
+#   score    POST /score only
+#   report   POST /report, a different client per request (every one a build)
+#   mixed    half the connections on /report, half on /score: the /score
+#            latencies show whether PDF builds hold up the event loop
+#
+#   python benchmarks/bench_api.py                       # starts api.py on a free port
+#   python benchmarks/bench_api.py --url http://127.0.0.1:8600 --only score
+#
+# The client is a minimal HTTP/1.1 client on asyncio streams, so it needs
+# nothing beyond the standard library.
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from risk_core import risk_tolerance, risk_capacity  # noqa: E402
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def answers(rng):
+    return {
+        "tol": [rng.randrange(len(q.options)) for q in risk_tolerance.questions],
+        "cap": [rng.randrange(len(q.options)) for q in risk_capacity.questions],
+    }
+
+
+class Connection:
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def post(self, path, payload):
+        """(status, body) of one request; reconnects if the server closed the connection."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode()
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        status_line = await self.reader.readline()
+        if not status_line:
+            self.writer = None
+            raise ConnectionError("connection closed by the server")
+        headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        data = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            self.writer.close()
+            self.writer = None
+        return int(status_line.split()[1]), data
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def _worker(conn, endpoint, seed, tag, until, latencies, errors):
+    rng = random.Random(seed)
+    n = 0
+    while time.perf_counter() < until:
+        payload = answers(rng)
+        if endpoint == "/report":
+            n += 1
+            payload.update(client_name=f"Load Test {tag}-{seed}-{n}", client_email=f"load{seed}-{n}@example.com")
+        start = time.perf_counter()
+        try:
+            status, _ = await conn.post(endpoint, payload)
+        except (OSError, asyncio.IncompleteReadError):
+            status = None
+        if status == 200:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(status)
+
+
+async def run_scenario(host, port, plan, duration):
+    """plan: [(endpoint, connections)]; returns {endpoint: (latencies, errors)}."""
+    results = {endpoint: ([], []) for endpoint, _ in plan}
+    conns, tasks = [], []
+    until = time.perf_counter() + duration
+    tag = time.time_ns()    # new client names every scenario, so no report is a cache hit
+    seed = 0
+    for endpoint, count in plan:
+        for _ in range(count):
+            conn = Connection(host, port)
+            conns.append(conn)
+            seed += 1
+            tasks.append(_worker(conn, endpoint, seed, tag, until, *results[endpoint]))
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    for conn in conns:
+        conn.close()
+    return results, elapsed
+
+
+def _report(name, results, elapsed):
+    for endpoint, (latencies, errors) in results.items():
+        if not latencies:
+            print(f"  {name:8s} {endpoint:8s} no successful requests ({len(errors)} errors)")
+            continue
+        print(f"  {name:8s} {endpoint:8s} {len(latencies) / elapsed:9.1f} req/s   "
+              f"p50 {percentile(latencies, 50) * 1000:7.1f} ms   p95 {percentile(latencies, 95) * 1000:7.1f} ms   "
+              f"p99 {percentile(latencies, 99) * 1000:7.1f} ms   errors {len(errors)}")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(port, workers):
+    cmd = [sys.executable, os.path.join(ROOT, "api.py"), "--port", str(port)]
+    if workers:
+        cmd += ["--workers", str(workers)]
+    server = subprocess.Popen(cmd, cwd=ROOT)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    sys.exit("api.py did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for api.py")
+    parser.add_argument("--url", help="a running server (default: start api.py on a free port)")
+    parser.add_argument("--workers", type=int, help="PDF build processes for the started server")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--only", nargs="+", choices=["score", "report", "mixed"],
+                        default=["score", "report", "mixed"])
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", _free_port()
+        server = _start_server(port, args.workers)
+
+    plans = {
+        "score": [("/score", args.concurrency)],
+        "report": [("/report", args.concurrency)],
+        "mixed": [("/report", args.concurrency // 2), ("/score", args.concurrency - args.concurrency // 2)],
+    }
+    try:
+        # One short warm-up so pool start-up and first imports stay out of the numbers
+        asyncio.run(run_scenario(host, port, [("/report", 4), ("/score", 4)], 1.0))
+        print(f"http://{host}:{port}  {args.concurrency} connections, {args.duration:g} s per scenario")
+        for name in args.only:
+            _report(name, *asyncio.run(run_scenario(host, port, plans[name], args.duration)))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# Per-click latency and CPU of the questionnaire page, driven through AppTest
+# ------------------------------------------------------------------------
+# One client fills in the page one radio click at a time (tolerance, then
+# capacity, then a few changed answers on the finished questionnaire) and
+# each click's script run is timed: wall time and CPU time of the script
+# thread, i.e. the server-side cost of the click. Run it against an older
+# app.py to compare with full-page reruns:
+#
+#   python benchmarks/bench_fragments.py
+#   git show <rev>:app.py > /tmp/app_full.py
+#   python benchmarks/bench_fragments.py --app /tmp/app_full.py
+#
+# AppTest has no public support for fragment-scoped runs: after one, its
+# element tree only holds the fragments that ran, and the next run would send
+# no state for the widgets outside them (the client details come back empty).
+# BrowserSession keeps the last state of every widget and sends all of them,
+# the way the browser does. AppTest also compiles the script afresh for every
+# run and polls for its end with sleeps; instrument() shares one compiled
+# script like the server does and times the script thread itself.
+import argparse
+import atexit
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The app stores every finished questionnaire and may queue report emails;
+# keep the simulated clients out of the real databases. Set before app.py
+# first imports risk_core.store and risk_core.mailer, which read these once.
+SCRATCH = tempfile.mkdtemp(prefix="risk-bench-")
+atexit.register(shutil.rmtree, SCRATCH, ignore_errors=True)
+os.environ["RISK_DB_PATH"] = os.path.join(SCRATCH, "submissions.db")
+os.environ["RISK_OUTBOX_PATH"] = os.path.join(SCRATCH, "outbox.db")
+
+from risk_core import risk_tolerance, risk_capacity  # noqa: E402
+
+script_runs = []   # (wall seconds, CPU seconds) of every script run
+
+
+def instrument():
+    from streamlit.runtime.scriptrunner import script_runner
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+
+    if getattr(script_runner.ScriptRunner._run_script, "instrumented", False):
+        return
+    shared = ScriptCache()
+    local_script_runner.ScriptCache = lambda: shared
+    run_script = script_runner.ScriptRunner._run_script
+
+    def timed(self, *args, **kwargs):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            return run_script(self, *args, **kwargs)
+        finally:
+            script_runs.append((time.perf_counter() - wall, time.thread_time() - cpu))
+
+    timed.instrumented = True
+    script_runner.ScriptRunner._run_script = timed
+
+
+class BrowserSession:
+    def __init__(self, path, timeout=60):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(path, default_timeout=timeout)
+        self.states = {}
+        self.radios = {}
+        self.run()
+
+    def run(self):
+        """Run the script with the current value of every widget seen so far."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetStates
+
+        if self.at._tree is not None:
+            for state in self.at._tree.get_widget_states().widgets:
+                self.states[state.id] = state
+        widget_states = WidgetStates()
+        widget_states.widgets.extend(self.states.values())
+        self.at._run(widget_states)
+        for state in self.at._tree.get_widget_states().widgets:
+            self.states[state.id] = state
+        self.radios.update((radio.key, radio) for radio in self.at.radio)
+        return self.at
+
+    def click(self, key, value):
+        """Choose an option of a radio that is on the page, even if the last run did not draw it."""
+        radio = self.radios[key].set_value(value)
+        self.states[radio.id] = radio._widget_state
+
+    def timed_run(self):
+        """(wall seconds, CPU seconds) of the script run; needs instrument()."""
+        del script_runs[:]
+        self.run()
+        return script_runs[-1]
+
+
+def _clicks(seed):
+    rng = random.Random(seed)
+    for prefix, section in (("tol", risk_tolerance), ("cap", risk_capacity)):
+        phase = "tolerance" if prefix == "tol" else "capacity"
+        for i, q in enumerate(section.questions):
+            yield phase, f"{prefix}_{i}", rng.randrange(len(q.options))
+    for _ in range(6):
+        prefix, section = rng.choice((("tol", risk_tolerance), ("cap", risk_capacity)))
+        i = rng.randrange(len(section.questions))
+        yield "change", f"{prefix}_{i}", rng.randrange(len(section.questions[i].options))
+
+
+def run(path, rounds, seed=0):
+    timings = {}
+    for r in range(rounds):
+        session = BrowserSession(path)
+        session.at.text_input[0].input(f"Client {r}")
+        session.at.text_input[1].input(f"client{r}@example.com")
+        session.run()
+        for phase, key, value in _clicks(seed + r):
+            session.click(key, value)
+            timings.setdefault(phase, []).append(session.timed_run())
+            if session.at.exception:
+                raise RuntimeError(session.at.exception[0].message)
+        # A run without a click redraws the whole page
+        session.run()
+        if session.at.text_input[0].value != f"Client {r}" or not session.at.markdown:
+            raise RuntimeError("client details were lost between runs")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-click rerun cost of app.py")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    path = os.path.abspath(args.app)
+
+    instrument()
+    run(path, 1)     # imports, questionnaire and report assets
+    timings = run(path, args.rounds)
+    print(f"{path}: {args.rounds} clients")
+    print(f"  {'clicks':10s} {'n':>4s} {'median ms':>10s} {'p95 ms':>8s} {'CPU ms':>8s}")
+    for phase, values in timings.items():
+        wall = sorted(w for w, _ in values)
+        p95 = wall[min(len(wall) - 1, int(0.95 * len(wall)))]
+        cpu = statistics.mean(c for _, c in values)
+        print(f"  {phase:10s} {len(values):4d} {statistics.median(wall) * 1000:10.2f} "
+              f"{p95 * 1000:8.2f} {cpu * 1000:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# Startup cost of importing the core package
+# ------------------------------------------------------------------------
+# Runs `python -X importtime -c "import risk_core"` in fresh interpreters and
+# reports the package's cumulative import time (best of N runs). Exits non-zero
+# if it exceeds --max-ms or if a heavy dependency that should be lazy
+# (ReportLab, Streamlit, NumPy) was pulled in by the import.
+#
+#   python benchmarks/bench_import.py [--runs 5] [--max-ms 60]
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY = ("reportlab", "streamlit", "numpy")
+
+
+def import_profile(module):
+    """Return {module name: cumulative µs} for one fresh `import module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time check for risk_core")
+    parser.add_argument("--module", default="risk_core")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=60.0, help="fail above this cumulative import time")
+    args = parser.parse_args()
+
+    profiles = [import_profile(args.module) for _ in range(args.runs)]
+    best_ms = min(p[args.module] for p in profiles) / 1000
+    heavy = sorted({name.split(".")[0] for p in profiles for name in p if name.split(".")[0] in LAZY})
+
+    print(f"import {args.module}: {best_ms:.1f} ms (best of {args.runs}, limit {args.max_ms:.0f} ms)")
+    failed = False
+    if heavy:
+        print(f"FAIL: eagerly imports {', '.join(heavy)}")
+        failed = True
+    if best_ms > args.max_ms:
+        print("FAIL: import time above limit")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Report email delivery throughput, offline
+# ------------------------------------------------------------------------
+# Starts a local SMTP server (aiosmtpd, which only this benchmark needs),
+# queues n reports in a fresh outbox and times how long the mailer takes to
+# deliver them all. The outbox is filled before the mailer starts, as after a
+# restart with a backlog; the enqueue timings are what an app rerun pays.
+# With --fail-first the server answers the first k messages with a temporary
+# 451 error, which exercises the retry path.
+#
+#   pip install aiosmtpd
+#   python benchmarks/bench_mailer.py [-n 500] [--connections 4] [--fail-first 50]
+import argparse
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_report import SAMPLE_ARGS  # noqa: E402
+from risk_core.mailer import Mailer, Outbox  # noqa: E402
+from risk_core.report import generate_pdf  # noqa: E402
+
+
+class Sink:
+    """aiosmtpd handler that counts what it accepts."""
+
+    def __init__(self, fail_first=0):
+        self.received = 0
+        self.rejected = 0
+        self.sessions = set()
+        self.fail_left = fail_first
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        if self.fail_left > 0:
+            self.fail_left -= 1
+            self.rejected += 1
+            return "451 4.3.0 Try again later"
+        self.received += 1
+        return "250 OK"
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main():
+    from aiosmtpd.controller import Controller
+
+    parser = argparse.ArgumentParser(description="Offline report email throughput")
+    parser.add_argument("-n", type=int, default=500, help="reports to deliver")
+    parser.add_argument("--connections", type=int, default=4, help="SMTP connections in the pool")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--fail-first", type=int, default=0, help="messages the server rejects once")
+    args = parser.parse_args()
+
+    sink = Sink(args.fail_first)
+    controller = Controller(sink, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    pdf = generate_pdf(*SAMPLE_ARGS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "outbox.db")
+        outbox = Outbox(path)
+        enqueue = []
+        for i in range(args.n):
+            start = time.perf_counter()
+            outbox.put(f"client{i}@example.com", f"Client {i}", pdf)
+            enqueue.append(time.perf_counter() - start)
+        outbox.close()
+
+        start = time.perf_counter()
+        mailer = Mailer(path, host=controller.hostname, port=controller.port, start_tls=False,
+                        connections=args.connections, batch_size=args.batch_size, backoff_base=0.1)
+        deadline = time.monotonic() + 120
+        while sink.received < args.n and time.monotonic() < deadline:
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        # The sink sees the last messages before the worker settles their batch
+        while mailer.outbox.counts().get("queued") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        counts = mailer.outbox.counts()
+        opened = mailer.pool.opened
+        mailer.stop()
+    controller.stop()
+
+    enqueue.sort()
+    print(f"{args.n} reports of {len(pdf) / 1024:.1f} KiB, {args.connections} connections, batches of {args.batch_size}")
+    print(f"  enqueue          median {statistics.median(enqueue) * 1000:.2f} ms, "
+          f"p95 {enqueue[int(0.95 * (len(enqueue) - 1))] * 1000:.2f} ms")
+    print(f"  delivered        {sink.received} in {elapsed:.2f} s ({sink.received / elapsed:.0f} messages/s)")
+    print(f"  rejected (451)   {sink.rejected}, all retried" if sink.received == args.n else
+          f"  rejected (451)   {sink.rejected}")
+    print(f"  SMTP sessions    {len(sink.sessions)} (pool opened {opened})")
+    print(f"  outbox           {counts}")
+    if sink.received < args.n:
+        sys.exit(f"only {sink.received} of {args.n} reports were delivered")
+
+
+if __name__ == "__main__":
+    main()
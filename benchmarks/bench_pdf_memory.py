@@ -0,0 +1,123 @@
+# Peak memory of PDF output for a batch of reports
+# ------------------------------------------------------------------------
+# For each output mode of generate_pdf, builds n reports in a fresh process and
+# keeps every finished one until the end, as a batch waiting to be sent or
+# archived does, then reports how much the peak RSS grew over a warmed-up
+# process. A single build is also traced with tracemalloc, which is too slow
+# (about 1 s a build) to trace the whole batch.
+#
+#   bytes     generate_pdf(...) returns the document
+#   spooled   written into pdf_output.spooled(), one per report
+#   buffer    written into one preallocated arena, one slot per report
+#
+# Then runs bulk_reports on an n-row CSV in a subprocess and reports the peak
+# RSS of the main process and of the largest worker.
+#
+#   python benchmarks/bench_pdf_memory.py [-n 1000] [--workers 2] [--skip-bulk]
+import argparse
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_report import SAMPLE_ARGS  # noqa: E402
+from risk_core import pdf_output, risk_tolerance, risk_capacity  # noqa: E402
+from risk_core.batch_scoring import TOL_FIELDS, CAP_FIELDS  # noqa: E402
+from risk_core.report import generate_pdf, report_assets  # noqa: E402
+
+SLOT = 16 * 1024    # arena slot per report in buffer mode; sample reports are ~6.5 KiB
+
+
+def _build(mode, n, arena):
+    if mode == "bytes":
+        return generate_pdf(*SAMPLE_ARGS)
+    if mode == "spooled":
+        f = pdf_output.spooled()
+        generate_pdf(*SAMPLE_ARGS, out=f)
+        return f
+    size = generate_pdf(*SAMPLE_ARGS, out=arena[n * SLOT:(n + 1) * SLOT])
+    return arena[n * SLOT:n * SLOT + size]
+
+
+def _rss_kib(field):
+    # VmHWM is the peak resident size so far, VmRSS the current one
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+
+
+def measure(mode, n):
+    """(KiB traced for one build, peak and retained RSS growth in KiB for n, seconds); run in a fresh process."""
+    report_assets()
+    scratch = memoryview(bytearray(SLOT)) if mode == "buffer" else None
+    _build(mode, 0, scratch)
+    tracemalloc.start()
+    _build(mode, 0, scratch)
+    single = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    base = _rss_kib("VmHWM")
+    arena = memoryview(bytearray(SLOT * n)) if mode == "buffer" else None    # counted in the growth
+    kept = []
+    start = time.perf_counter()
+    for i in range(n):
+        kept.append(_build(mode, i, arena))
+    elapsed = time.perf_counter() - start
+    peak, current = _rss_kib("VmHWM"), _rss_kib("VmRSS")
+    for f in kept:
+        if hasattr(f, "close"):
+            f.close()
+    return single / 1024, peak - base, current - base, elapsed
+
+
+def bulk_rss(n, workers):
+    """(parent, largest worker) peak RSS in MiB for bulk_reports on n rows."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "responses.csv")
+        with open(path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["id", "client_name", "client_email"] + TOL_FIELDS + CAP_FIELDS)
+            for i in range(n):
+                w.writerow([f"r{i}", f"Client {i}", f"client{i}@example.com"]
+                           + [i % len(q.options) for q in risk_tolerance.questions]
+                           + [i % len(q.options) for q in risk_capacity.questions])
+        code = ("import sys; from risk_core import bulk_reports as b; "
+                f"b.run(sys.argv[1], sys.argv[2], {workers}); print(*b.peak_rss_mib())")
+        out = subprocess.run([sys.executable, "-c", code, path, os.path.join(tmp, "reports.zip")],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    parent, child = out.split()
+    return float(parent), float(child)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of PDF output")
+    parser.add_argument("-n", type=int, default=1000, help="reports per mode")
+    parser.add_argument("--workers", type=int, default=2, help="bulk_reports worker processes")
+    parser.add_argument("--skip-bulk", action="store_true")
+    parser.add_argument("--mode", help=argparse.SUPPRESS)     # one measurement, in a child process
+    args = parser.parse_args()
+
+    if args.mode:
+        print(*measure(args.mode, args.n))
+        return
+    print(f"{args.n} reports kept in memory (KiB)")
+    print(f"  {'mode':8s} {'1 build':>9s} {'peak RSS +':>11s} {'retained':>9s} {'s':>6s}")
+    for mode in ("bytes", "spooled", "buffer"):
+        out = subprocess.run([sys.executable, __file__, "--mode", mode, "-n", str(args.n)],
+                             capture_output=True, text=True, check=True).stdout
+        single, peak, retained, elapsed = map(float, out.split())
+        print(f"  {mode:8s} {single:9.0f} {peak:11.0f} {retained:9.0f} {elapsed:6.1f}")
+    if not args.skip_bulk:
+        parent, child = bulk_rss(args.n, args.workers)
+        print(f"bulk_reports, {args.n} rows to a ZIP, {args.workers} workers: "
+              f"peak RSS {parent:.0f} MiB main process, {child:.0f} MiB largest worker")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# Rerun latency with many concurrent questionnaire completions
+# ------------------------------------------------------------------------
+# Each simulated session finishes the questionnaire at the same moment and then
+# "reruns" every poll interval until its report is ready, the way app.py's
+# polling fragment does. The script-side cost of each rerun is the time spent
+# in render_pool.request(); with the old inline path it was a full build.
+#
+#   python benchmarks/bench_render_pool.py [--sessions 64]
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_report import SAMPLE_ARGS  # noqa: E402
+from risk_core.render_pool import RenderPool, READY  # noqa: E402
+from risk_core.report import generate_pdf, report_assets  # noqa: E402
+from risk_core.report_cache import ReportCache, report_key  # noqa: E402
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def session_args(i):
+    args = list(SAMPLE_ARGS)
+    args[-2] = f"Client {i}"
+    return tuple(args)
+
+
+def run_pooled(sessions, poll):
+    pool = RenderPool(cache=ReportCache(max_entries=sessions * 2, max_bytes=1 << 30))
+    reruns, ready_after = [], []
+    lock = threading.Lock()
+    start_gate = threading.Barrier(sessions)
+
+    def session(i):
+        args = session_args(i)
+        key = report_key(args[-2], args[-1], args[-4], args[-3], "bench")
+        start_gate.wait()
+        started = time.perf_counter()
+        while True:
+            t = time.perf_counter()
+            state, _ = pool.request(key, generate_pdf, *args)
+            with lock:
+                reruns.append(time.perf_counter() - t)
+            if state == READY:
+                break
+            time.sleep(poll)
+        with lock:
+            ready_after.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    pool.shutdown()
+    return reruns, ready_after
+
+
+def run_inline(sessions):
+    reruns = []
+    lock = threading.Lock()
+
+    def session(i):
+        t = time.perf_counter()
+        generate_pdf(*session_args(i))
+        with lock:
+            reruns.append(time.perf_counter() - t)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    return reruns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rerun latency under concurrent completions")
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--poll", type=float, default=0.5, help="seconds between polling reruns")
+    args = parser.parse_args()
+
+    report_assets()
+    inline = run_inline(args.sessions)
+    pooled, ready_after = run_pooled(args.sessions, args.poll)
+
+    ms = lambda v: f"{v * 1000:9.2f} ms"  # noqa: E731
+    print(f"{args.sessions} concurrent completions")
+    print(f"inline build   rerun p50 {ms(percentile(inline, 50))}  p99 {ms(percentile(inline, 99))}")
+    print(f"render pool    rerun p50 {ms(percentile(pooled, 50))}  p99 {ms(percentile(pooled, 99))}"
+          f"  ({len(pooled)} reruns)")
+    print(f"report ready   p50 {ms(percentile(ready_after, 50))}  p99 {ms(percentile(ready_after, 99))}"
+          f"  mean {ms(statistics.mean(ready_after))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Per-report PDF build benchmark
+# ------------------------------------------------------------------------
+# Compares a "cold" build, where the static report assets are rebuilt for every
+# report (what generate_pdf used to do), with a "warm" build that reuses the
+# assets prepared once per process. "first report" also reruns the growth
+# projection's Monte Carlo simulation, as the first report in a process does.
+#
+#   python benchmarks/bench_report.py [-n 50]
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk_core.projections import project  # noqa: E402
+from risk_core.report import generate_pdf, projection_assets, report_assets  # noqa: E402
+
+SAMPLE_ANSWERS = [
+    (f"Sample question {i} about how you feel when markets move sharply?",
+     f"Sample answer {i} — I'd stay calm but stay aware of the movements")
+    for i in range(1, 9)
+]
+
+SAMPLE_ARGS = (
+    24, "Moderate", "Seeks a balance between growth and stability.",
+    30, "Moderately Aggressive", "Strong financial stability and capacity for risk.",
+    "Your tolerance and capacity are broadly aligned — your overall position looks appropriate.",
+    "Moderate", SAMPLE_ANSWERS, SAMPLE_ANSWERS, "Sample Client", "client@example.com",
+)
+
+
+def _clear(cold, simulate):
+    if cold:
+        report_assets.cache_clear()
+        projection_assets.cache_clear()
+    if simulate:
+        project.cache_clear()
+
+
+def measure(n, cold, simulate=False):
+    times, peaks = [], []
+    generate_pdf(*SAMPLE_ARGS)  # keep one-off imports/font setup out of the numbers
+    for _ in range(n):
+        _clear(cold, simulate)
+        start = time.perf_counter()
+        generate_pdf(*SAMPLE_ARGS)
+        times.append(time.perf_counter() - start)
+    # tracemalloc slows allocation-heavy code down a lot, so memory is
+    # measured in a separate, shorter pass
+    for _ in range(max(1, n // 5)):
+        _clear(cold, simulate)
+        tracemalloc.start()
+        generate_pdf(*SAMPLE_ARGS)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {
+        "median_ms": statistics.median(times) * 1000,
+        "peak_kib": statistics.median(peaks) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-report PDF build benchmark")
+    parser.add_argument("-n", type=int, default=30, help="reports per mode")
+    args = parser.parse_args()
+
+    for label, cold, simulate in (("first report", True, True), ("cold assets", True, False),
+                                  ("warm assets", False, False)):
+        r = measure(args.n, cold, simulate)
+        print(f"{label:12s}  {r['median_ms']:8.2f} ms/report  "
+              f"{r['peak_kib']:9.1f} KiB allocated at peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# Multi-session load harness for app.py
+# ------------------------------------------------------------------------
+# Runs N simulated clients at once through the real page with AppTest, one
+# thread each, all sharing this process's render pool and report cache the
+# way sessions share a server. Every client types their details, answers the
+# 16 questions one click at a time with a random pause before each click, then
+# polls like the app's report fragment until the download button appears.
+# Concurrency is stepped up (--levels) and for each level the harness reports:
+#
+#   rerun    script-run time of every rerun (server side, as in bench_fragments)
+#   click    click-to-page time seen by the client, including AppTest's own
+#            overhead, so only its growth between levels is meaningful
+#   pdf      time from the report being requested to it being ready, and the
+#            build itself
+#   reruns/s completed reruns per second across all sessions
+#
+# The saturation point is the first level whose p95 rerun time is more than
+# twice the single-session p95 (or where throughput stops growing). Memory per
+# session is measured separately with tracemalloc (--memory-sessions) and
+# includes AppTest's copy of each page, so it is an upper bound.
+#
+#   python benchmarks/bench_sessions.py [--levels 1 2 4 8 16 32] [--think 0.3]
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_fragments import BrowserSession, instrument, script_runs  # noqa: E402
+from risk_core import risk_tolerance, risk_capacity  # noqa: E402
+from risk_core.render_pool import RenderPool, render_pool  # noqa: E402
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+POLL = 0.5      # the app's report fragment polls every 0.5 s
+
+_lock = threading.Lock()
+_requested = {}     # report key -> when a session first asked for it
+pdf_ready = []      # seconds from request to ready
+pdf_build = []      # seconds spent building
+
+
+def instrument_render_pool():
+    request, render = RenderPool.request, RenderPool._render
+
+    def timed_request(self, key, build, *args):
+        with _lock:
+            _requested.setdefault(key, time.perf_counter())
+        return request(self, key, build, *args)
+
+    def timed_render(self, key, build, args):
+        start = time.perf_counter()
+        try:
+            return render(self, key, build, args)
+        finally:
+            end = time.perf_counter()
+            with _lock:
+                pdf_build.append(end - start)
+                pdf_ready.append(end - _requested.pop(key, start))
+
+    RenderPool.request, RenderPool._render = timed_request, timed_render
+
+
+def allow_concurrent_apptests():
+    # AppTest installs a mock Runtime for each run and sets Runtime._instance
+    # back to None afterwards, which breaks any run still going in another
+    # thread. Keep the last one installed instead, and pin the config flag
+    # that each run patches and restores.
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test
+
+    class KeepInstance(type):
+        def __setattr__(cls, name, value):
+            if name != "_instance":
+                super().__setattr__(name, value)
+            elif value is not None:
+                Runtime._instance = value
+
+    app_test.Runtime = KeepInstance("SharedRuntime", (Runtime,), {})
+    config.set_option("global.appTest", True)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+# --- One simulated client ---------------------------------------------------------
+def client(n, think, seed, clicks, errors, sessions=None):
+    rng = random.Random(seed)
+    try:
+        session = BrowserSession(APP)
+        session.at.text_input[0].input(f"Load Client {seed}")
+        session.at.text_input[1].input(f"load{seed}@example.com")
+        session.run()
+        for prefix, section in (("tol", risk_tolerance), ("cap", risk_capacity)):
+            for i, q in enumerate(section.questions):
+                time.sleep(rng.uniform(0, 2 * think))
+                session.click(f"{prefix}_{i}", rng.randrange(len(q.options)))
+                start = time.perf_counter()
+                session.run()
+                clicks.append(time.perf_counter() - start)
+        deadline = time.monotonic() + 120
+        while not session.at.get("download_button"):
+            if time.monotonic() > deadline:
+                raise TimeoutError("report was not ready after 120 s")
+            time.sleep(POLL)
+            session.run()
+        if session.at.exception:
+            raise RuntimeError(session.at.exception[0].message)
+        if sessions is not None:
+            sessions.append(session)
+    except Exception as exc:
+        errors.append(f"session {n}: {type(exc).__name__}: {exc}")
+
+
+def run_level(count, think, seed, sessions=None):
+    clicks, errors = [], []
+    del script_runs[:], pdf_ready[:], pdf_build[:]
+    threads = [threading.Thread(target=client, args=(n, think, seed + n, clicks, errors, sessions))
+               for n in range(count)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "sessions": count,
+        "rerun": [wall for wall, _ in script_runs],
+        "click": clicks,
+        "pdf_ready": list(pdf_ready),
+        "pdf_build": list(pdf_build),
+        "reruns_per_s": len(script_runs) / elapsed,
+        "errors": errors,
+    }
+
+
+def measure_memory(count, think, seed):
+    """Traced bytes held per finished session, kept alive until measured."""
+    sessions = []
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = run_level(count, think, seed, sessions)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held / max(1, len(sessions)), result["errors"]
+
+
+def _ms(values, q):
+    return f"{percentile(values, q) * 1000:8.1f}" if values else f"{'-':>8s}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load harness for app.py")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--think", type=float, default=0.3, help="mean pause before each click (s)")
+    parser.add_argument("--memory-sessions", type=int, default=20, help="0 to skip the memory pass")
+    args = parser.parse_args()
+
+    instrument()
+    instrument_render_pool()
+    allow_concurrent_apptests()
+    run_level(1, 0, seed=0)     # imports, compiled script, report assets
+
+    print(f"{'sessions':>8s} {'reruns/s':>9s} {'rerun p50':>9s} {'p95':>8s} {'p99':>8s} "
+          f"{'click p95':>9s} {'pdf p50':>8s} {'p95':>8s} {'build p50':>9s} {'errors':>6s}")
+    rows, seed = [], 1000
+    for count in args.levels:
+        r = run_level(count, args.think, seed)
+        seed += count
+        rows.append(r)
+        print(f"{count:8d} {r['reruns_per_s']:9.1f} {_ms(r['rerun'], 50)} {_ms(r['rerun'], 95)} "
+              f"{_ms(r['rerun'], 99)}  {_ms(r['click'], 95)} {_ms(r['pdf_ready'], 50)} "
+              f"{_ms(r['pdf_ready'], 95)}  {_ms(r['pdf_build'], 50)} {len(r['errors']):6d}")
+        for error in r["errors"][:3]:
+            print(f"         {error}")
+
+    base = percentile(rows[0]["rerun"], 95)
+    saturated = None
+    for prev, row in zip(rows, rows[1:]):
+        if percentile(row["rerun"], 95) > 2 * base or row["reruns_per_s"] < 1.1 * prev["reruns_per_s"]:
+            saturated = row
+            break
+    if saturated:
+        print(f"saturation: {saturated['sessions']} sessions (p95 rerun "
+              f"{percentile(saturated['rerun'], 95) * 1000:.1f} ms vs {base * 1000:.1f} ms for one session, "
+              f"{saturated['reruns_per_s']:.1f} reruns/s); last level before it: "
+              f"{rows[rows.index(saturated) - 1]['sessions']} sessions")
+    else:
+        print(f"no saturation up to {rows[-1]['sessions']} sessions")
+
+    if args.memory_sessions:
+        per_session, errors = measure_memory(args.memory_sessions, 0, seed)
+        print(f"memory: {per_session / 1024:.0f} KiB per finished session "
+              f"({args.memory_sessions} sessions, tracemalloc, includes AppTest's page copy)"
+              + (f", {len(errors)} errors" if errors else ""))
+    print(f"CPUs: {os.cpu_count()}, render workers: {render_pool.max_workers}")
+
+
+if __name__ == "__main__":
+    main()
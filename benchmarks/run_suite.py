@@ -0,0 +1,239 @@
+# Benchmark suite with JSON results and a regression check
+# ------------------------------------------------------------------------
+# Covers scalar and batch scoring throughput, Streamlit rerun cost (driven
+# through AppTest, so render_section and render_progress_sidebar run exactly as
+# in the app) and generate_pdf wall time, peak allocation and output size for
+# representative answer sets. Everything runs offline.
+#
+#   python benchmarks/run_suite.py                          # writes benchmarks/results/<time>.json
+#   python benchmarks/run_suite.py -o base.json             # save a baseline
+#   python benchmarks/run_suite.py --compare base.json      # fail on >25% slowdowns
+#   python benchmarks/run_suite.py --only pdf --compare base.json --threshold 0.1
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from risk_core import (  # noqa: E402
+    risk_tolerance, risk_capacity,
+    score_answers, generate_pdf,
+)
+
+# Metrics where a larger value is better; everything else is "lower is better"
+HIGHER_IS_BETTER = {"sheets_per_s", "rows_per_s"}
+# Only these are compared against a baseline; sizes and counts are informative
+TIMED = {"sheets_per_s", "rows_per_s", "median_ms", "p95_ms", "peak_alloc_kib"}
+
+
+def _timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _summary_ms(times):
+    times = sorted(times)
+    return {
+        "median_ms": statistics.median(times) * 1000,
+        "p95_ms": times[min(len(times) - 1, int(0.95 * len(times)))] * 1000,
+    }
+
+
+# --- Scoring ----------------------------------------------------------------------
+def bench_scoring_scalar():
+    rng = random.Random(0)
+    sheets = [([rng.randrange(5) for _ in range(8)], [rng.randrange(5) for _ in range(8)])
+              for _ in range(20_000)]
+
+    def run():
+        for tol_idx, cap_idx in sheets:
+            score_answers(tol_idx, cap_idx)
+
+    best = min(_timed(run, 5))
+    return {"sheets_per_s": len(sheets) / best}
+
+
+def bench_scoring_batch():
+    import numpy as np
+    from risk_core.batch_scoring import score_indices
+
+    rng = np.random.default_rng(0)
+    n = 500_000
+    tol_idx = rng.integers(0, 5, (n, 8), dtype=np.int16)
+    cap_idx = rng.integers(0, 5, (n, 8), dtype=np.int16)
+    best = min(_timed(lambda: score_indices(tol_idx, cap_idx), 5))
+    return {"rows_per_s": n / best}
+
+
+# --- Streamlit reruns -----------------------------------------------------------
+def _fill(session, prefix, count, seed):
+    rng = random.Random(seed)
+    for i in range(count):
+        session.run()      # the capacity radios appear once tolerance is complete
+        radio = session.radios[f"{prefix}_{i}"]
+        session.click(radio.key, rng.randrange(len(radio.options)))
+
+
+def bench_app_rerun():
+    # Full-page reruns (page load, report ready); per-click fragment reruns
+    # are measured by bench_fragments.py
+    from bench_fragments import BrowserSession
+
+    session = BrowserSession(os.path.join(ROOT, "app.py"))
+    session.at.text_input[0].input("Benchmark Client")
+    session.at.text_input[1].input("bench@example.com")
+    session.run()
+
+    results = {}
+    # Tolerance section half answered
+    _fill(session, "tol", 4, seed=1)
+    session.run()
+    results["partial"] = _summary_ms(_timed(session.run, 20))
+
+    # Everything answered; wait for the background report so reruns measure
+    # the steady state a client sees while re-reading their results
+    _fill(session, "tol", len(risk_tolerance.questions), seed=2)
+    _fill(session, "cap", len(risk_capacity.questions), seed=3)
+    session.run()
+    deadline = time.monotonic() + 60
+    while not session.at.get("download_button") and time.monotonic() < deadline:
+        time.sleep(0.1)
+        session.run()
+    results["complete"] = _summary_ms(_timed(session.run, 20))
+    return results
+
+
+# --- PDF build ----------------------------------------------------------------------
+LONG_TEXT = " ".join(["This answer was written out at great length by the client."] * 40)
+
+
+def _report_args(seed, long_text=False):
+    rng = random.Random(seed)
+
+    def answers(section):
+        idx = [rng.randrange(len(q.options)) for q in section.questions]
+        pairs = [(q.prompt, LONG_TEXT if long_text else q.options[i]) for q, i in zip(section.questions, idx)]
+        return idx, pairs
+
+    tol_idx, tol_answers = answers(risk_tolerance)
+    cap_idx, cap_answers = answers(risk_capacity)
+    r = score_answers(tol_idx, cap_idx)
+    return (r["tol_total"], r["tol_level"], r["tol_desc"], r["cap_total"], r["cap_level"], r["cap_desc"],
+            r["message"], r["overall_label"], tol_answers, cap_answers, "Benchmark Client", "bench@example.com")
+
+
+def bench_pdf():
+    cases = {"typical": _report_args(1), "long_answers": _report_args(2, long_text=True)}
+    generate_pdf(*cases["typical"])   # one-off imports and asset setup
+    results = {}
+    for name, args in cases.items():
+        times = _timed(lambda: generate_pdf(*args), 15)
+        tracemalloc.start()
+        pdf = generate_pdf(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = {**_summary_ms(times), "peak_alloc_kib": peak / 1024, "pdf_kib": len(pdf) / 1024}
+    return results
+
+
+BENCHMARKS = {
+    "scoring_scalar": bench_scoring_scalar,
+    "scoring_batch": bench_scoring_batch,
+    "app_rerun": bench_app_rerun,
+    "pdf": bench_pdf,
+}
+
+
+# --- Results ----------------------------------------------------------------------
+def _flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(current, baseline, threshold):
+    """Return a list of regressions larger than threshold (0.25 = 25%)."""
+    regressions = []
+    cur, base = _flatten(current["results"]), _flatten(baseline["results"])
+    for name, value in sorted(cur.items()):
+        metric = name.rsplit(".", 1)[-1]
+        if metric not in TIMED or not base.get(name):
+            continue
+        old = base[name]
+        change = (old - value) / old if metric in HIGHER_IS_BETTER else (value - old) / old
+        marker = "REGRESSION" if change > threshold else ""
+        print(f"  {name:40s} {old:14.2f} -> {value:14.2f}  {change * -100:+7.1f}%  {marker}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Risk questionnaire benchmark suite")
+    parser.add_argument("-o", "--output", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run a subset")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline results to check against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown as a fraction")
+    args = parser.parse_args()
+
+    started = datetime.now(timezone.utc)
+    results = {}
+    for name in args.only or BENCHMARKS:
+        print(f"running {name} ...", file=sys.stderr)
+        results[name] = BENCHMARKS[name]()
+
+    current = {
+        "meta": {
+            "timestamp": started.isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(ROOT, "benchmarks", "results",
+                                         started.strftime("%Y%m%dT%H%M%SZ") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"compared with {args.compare} (commit {baseline['meta'].get('commit')}):")
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+# Risk questionnaire core: data models, questionnaire definitions, scoring and
+# the PDF report builder, importable without Streamlit. ReportLab is only
+# loaded once a report is actually built, and NumPy only by the batch tools.
+from .questionnaire import (
+    Question, Section, Questionnaire, QUESTIONNAIRE_VERSION, load, available_versions,
+    risk_tolerance, risk_capacity,
+)
+from .scoring import (
+    option_score, interpret_tolerance, interpret_capacity, overall_message, combine_label, score_answers,
+)
+from .report import generate_pdf, build_report
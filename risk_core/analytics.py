@@ -0,0 +1,149 @@
+# Incrementally maintained advisor analytics
+# ------------------------------------------------------------------------
+# Aggregate tables that live next to the submissions table and are updated in
+# the same transaction as each batch of inserts (see store.SubmissionWriter):
+#
+#   agg_totals   (section, total)      -> count    histogram of totals
+#   agg_levels   (kind, level)         -> count    tol / cap / overall label mix
+#   agg_options  (question, option)    -> count    per-question option counts
+#   agg_daily    (day)                 -> submissions, tolerance_above, capacity_above
+#
+# Reading the dashboard is a handful of small, fixed-size queries, so its cost
+# does not grow with the number of submissions.
+import time
+from collections import Counter
+
+from .scoring import overall_message
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agg_totals (
+    section TEXT NOT NULL, total INTEGER NOT NULL, count INTEGER NOT NULL,
+    PRIMARY KEY (section, total)
+);
+CREATE TABLE IF NOT EXISTS agg_levels (
+    kind TEXT NOT NULL, level TEXT NOT NULL, count INTEGER NOT NULL,
+    PRIMARY KEY (kind, level)
+);
+CREATE TABLE IF NOT EXISTS agg_options (
+    question TEXT NOT NULL, option INTEGER NOT NULL, count INTEGER NOT NULL,
+    PRIMARY KEY (question, option)
+);
+CREATE TABLE IF NOT EXISTS agg_daily (
+    day TEXT PRIMARY KEY,
+    submissions INTEGER NOT NULL,
+    tolerance_above INTEGER NOT NULL,
+    capacity_above INTEGER NOT NULL
+);
+"""
+
+# overall_message outcome -> agg_daily column it is counted in
+_MISMATCH = {
+    overall_message(0, 0): None,
+    overall_message(6, 0): "tolerance_above",
+    overall_message(0, 6): "capacity_above",
+}
+
+
+def _day(ts):
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+
+def apply(conn, records, sign=1):
+    """Fold submission records (dicts keyed by column name) into the aggregates.
+
+    Must run inside the transaction that inserts the same records; sign=-1
+    takes out records that are being replaced.
+    """
+    totals, levels, options = Counter(), Counter(), Counter()
+    daily = {}
+    for r in records:
+        totals["tol", r["tol_total"]] += 1
+        totals["cap", r["cap_total"]] += 1
+        levels["tol", r["tol_level"]] += 1
+        levels["cap", r["cap_level"]] += 1
+        levels["overall", r["overall_label"]] += 1
+        for name, value in r.items():
+            if name.startswith(("tol_", "cap_")) and name[4:].isdigit():
+                options[name, value] += 1
+        day = daily.setdefault(_day(r["submitted_at"]), [0, 0, 0])
+        day[0] += 1
+        mismatch = _MISMATCH[overall_message(r["tol_total"], r["cap_total"])]
+        if mismatch == "tolerance_above":
+            day[1] += 1
+        elif mismatch == "capacity_above":
+            day[2] += 1
+    if sign != 1:
+        for counter in (totals, levels, options):
+            for k in counter:
+                counter[k] *= sign
+        daily = {d: [n * sign for n in counts] for d, counts in daily.items()}
+
+    conn.executemany(
+        "INSERT INTO agg_totals VALUES (?, ?, ?) "
+        "ON CONFLICT (section, total) DO UPDATE SET count = count + excluded.count",
+        [(*k, n) for k, n in totals.items()],
+    )
+    conn.executemany(
+        "INSERT INTO agg_levels VALUES (?, ?, ?) "
+        "ON CONFLICT (kind, level) DO UPDATE SET count = count + excluded.count",
+        [(*k, n) for k, n in levels.items()],
+    )
+    conn.executemany(
+        "INSERT INTO agg_options VALUES (?, ?, ?) "
+        "ON CONFLICT (question, option) DO UPDATE SET count = count + excluded.count",
+        [(*k, n) for k, n in options.items()],
+    )
+    conn.executemany(
+        "INSERT INTO agg_daily VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (day) DO UPDATE SET submissions = submissions + excluded.submissions, "
+        "tolerance_above = tolerance_above + excluded.tolerance_above, "
+        "capacity_above = capacity_above + excluded.capacity_above",
+        [(day, *counts) for day, counts in daily.items()],
+    )
+    if sign != 1:
+        for table in ("agg_totals", "agg_levels", "agg_options"):
+            conn.execute(f"DELETE FROM {table} WHERE count = 0")
+        conn.execute("DELETE FROM agg_daily WHERE submissions = 0")
+
+
+def rebuild(conn, batch_size=10_000):
+    """Recompute every aggregate from the submissions table (one full scan)."""
+    with conn:
+        for table in ("agg_totals", "agg_levels", "agg_options", "agg_daily"):
+            conn.execute(f"DELETE FROM {table}")
+        cur = conn.execute("SELECT * FROM submissions")
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            apply(conn, [dict(row) for row in rows])
+
+
+# --- Dashboard queries ---------------------------------------------------------------
+def dashboard(conn):
+    """Everything the advisor view shows, read from the aggregates only."""
+    totals = {"tol": {}, "cap": {}}
+    for section, total, count in conn.execute("SELECT section, total, count FROM agg_totals ORDER BY total"):
+        totals[section][total] = count
+
+    levels = {"tol": {}, "cap": {}, "overall": {}}
+    for kind, level, count in conn.execute("SELECT kind, level, count FROM agg_levels"):
+        levels[kind][level] = count
+
+    options = {}
+    for question, option, count in conn.execute("SELECT question, option, count FROM agg_options"):
+        options.setdefault(question, {})[option] = count
+
+    daily = [
+        {"day": day, "submissions": n, "tolerance_above": t, "capacity_above": c}
+        for day, n, t, c in conn.execute(
+            "SELECT day, submissions, tolerance_above, capacity_above FROM agg_daily ORDER BY day"
+        )
+    ]
+    return {
+        "submissions": sum(totals["tol"].values()),
+        "totals": totals,
+        "levels": levels,
+        "options": options,
+        "daily": daily,
+    }
@@ -0,0 +1,316 @@
+# Headless batch scoring of stored questionnaire responses
+# ------------------------------------------------------------------------
+# Scores whole columns of answers at once with NumPy. Every input row holds the
+# chosen option index (0–4, as stored under the tol_<i>/cap_<i> session keys)
+# for each question; any other fields are passed through to the output. Rows
+# with a questionnaire_version column (as exported from the submission store)
+# are scored with that version's option scores and bands; other rows with the
+# current questionnaire.
+#
+#   python -m risk_core.batch_scoring responses.csv -o scored.csv
+#   python -m risk_core.batch_scoring responses.jsonl -o scored.jsonl --chunk-size 100000
+#   python -m risk_core.batch_scoring --check
+#
+# Scores and band edges come from the compiled questionnaire definitions, and
+# labels and messages from tables built by calling the scalar functions in
+# scoring.py, so the batch path can never drift from the app.
+import argparse
+import csv
+import json
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+from .questionnaire import QUESTIONNAIRE_VERSION, available_versions, load, risk_tolerance, risk_capacity
+from .scoring import interpret_tolerance, interpret_capacity, overall_message, combine_label, score_answers
+
+TOL_FIELDS = [f"tol_{i}" for i in range(len(risk_tolerance.questions))]
+CAP_FIELDS = [f"cap_{i}" for i in range(len(risk_capacity.questions))]
+N_OPTIONS = 5
+
+# Lower edge of each level band of the current questionnaire; totals below the
+# first edge fall through to the last level, like Section.interpret
+BAND_EDGES = np.array(risk_tolerance.band_edges)
+ALIGNMENT_GAP = 6   # overall_message treats |tol - cap| < 6 as aligned
+
+TOL_LEVELS = [interpret_tolerance(int(edge)) for edge in BAND_EDGES]
+CAP_LEVELS = [interpret_capacity(int(edge)) for edge in BAND_EDGES]
+LEVEL_NAMES = [level for level, _ in TOL_LEVELS]
+# Level each band counts as when combined; combine_label matches level names by
+# prefix, so "Moderately Aggressive" combines as "Moderate"
+COMBINE_RANK = np.array([LEVEL_NAMES.index(combine_label(name, name)) for name in LEVEL_NAMES])
+MESSAGES = [
+    overall_message(0, 0),                  # aligned
+    overall_message(ALIGNMENT_GAP, 0),      # tolerance above capacity
+    overall_message(0, ALIGNMENT_GAP),      # capacity above tolerance
+]
+
+_LEVEL_ARRAY = np.array(LEVEL_NAMES, dtype=object)
+_MESSAGE_ARRAY = np.array(MESSAGES, dtype=object)
+
+RESULT_FIELDS = ["tol_total", "tol_level", "cap_total", "cap_level", "overall_label", "message"]
+
+
+# --- Vectorized scoring ---------------------------------------------------------
+@lru_cache(maxsize=None)
+def score_tables(version=QUESTIONNAIRE_VERSION):
+    """(score table, band edges) per section of a questionnaire version.
+
+    A score table is a (questions, options) array, so the scores of a whole
+    matrix of answer indices are one fancy-indexing lookup.
+    """
+    questionnaire = load(version)
+    tables = []
+    for section in (questionnaire["tol"], questionnaire["cap"]):
+        if list(section.levels) != LEVEL_NAMES:
+            raise ValueError(f"questionnaire {version}: {section.key} levels differ from {LEVEL_NAMES}")
+        scores = np.array([q.scores for q in section.questions])
+        tables.append((scores, np.array(section.band_edges)))
+    return tables
+
+
+def level_codes(totals, edges=BAND_EDGES):
+    """Index into LEVEL_NAMES for each total."""
+    codes = np.searchsorted(edges, totals, side="right") - 1
+    codes[codes < 0] = len(edges) - 1
+    return codes
+
+
+def message_codes(tol_totals, cap_totals):
+    """Index into MESSAGES for each (tolerance, capacity) pair."""
+    codes = np.where(tol_totals > cap_totals, 1, 2)
+    codes[np.abs(tol_totals - cap_totals) < ALIGNMENT_GAP] = 0
+    return codes
+
+
+def score_indices(tol_idx, cap_idx, version=QUESTIONNAIRE_VERSION):
+    """Score (n, questions) arrays of option indices answered on `version`.
+
+    Returns integer arrays; map levels through LEVEL_NAMES and messages
+    through MESSAGES to get the strings the app shows.
+    """
+    (tol_scores, tol_edges), (cap_scores, cap_edges) = score_tables(version)
+    tol_total = tol_scores[np.arange(tol_scores.shape[0]), np.asarray(tol_idx)].sum(axis=1)
+    cap_total = cap_scores[np.arange(cap_scores.shape[0]), np.asarray(cap_idx)].sum(axis=1)
+    tol_level = level_codes(tol_total, tol_edges)
+    cap_level = level_codes(cap_total, cap_edges)
+    return {
+        "tol_total": tol_total,
+        "tol_level": tol_level,
+        "cap_total": cap_total,
+        "cap_level": cap_level,
+        # combine_label keeps the more conservative (lower) of the two levels
+        "overall_label": np.minimum(COMBINE_RANK[tol_level], COMBINE_RANK[cap_level]),
+        "message": message_codes(tol_total, cap_total),
+    }
+
+
+# --- File input / output --------------------------------------------------------
+def read_table(path):
+    """Return (header, iterator of row lists) for a CSV or JSONL file."""
+    if path.endswith(".jsonl"):
+        f = open(path, encoding="utf-8")
+        records = (json.loads(line) for line in f if line.strip())
+        first = next(records, None)
+        if first is None:
+            f.close()
+            return [], iter(())
+        header = list(first)
+
+        def rows():
+            with f:
+                yield [first.get(k) for k in header]
+                for rec in records:
+                    yield [rec.get(k) for k in header]
+        return header, rows()
+
+    f = open(path, newline="", encoding="utf-8")
+    reader = csv.reader(f)
+    header = next(reader, [])
+
+    def rows():
+        with f:
+            yield from reader
+    return header, rows()
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _answer_matrix(chunk, columns, first_row):
+    try:
+        values = [row[j] for row in chunk for j in columns]
+        if isinstance(values[0], str) and set(map(len, values)) == {1}:
+            # CSV fast path: every answer is a single character, so the whole
+            # chunk decodes in one frombuffer call instead of int() per cell
+            flat = np.frombuffer("".join(values).encode("ascii"), dtype=np.uint8).astype(np.int16) - ord("0")
+        else:
+            flat = np.array([int(v) for v in values], dtype=np.int16)
+    except (IndexError, TypeError, ValueError):
+        raise ValueError(_first_bad_answer(chunk, columns, first_row)) from None
+    idx = flat.reshape(len(chunk), len(columns))
+    bad = np.flatnonzero(((idx < 0) | (idx >= N_OPTIONS)).any(axis=1))
+    if bad.size:
+        raise ValueError(f"row {first_row + int(bad[0])}: answer index outside 0–{N_OPTIONS - 1}")
+    return idx
+
+
+def _first_bad_answer(chunk, columns, first_row):
+    # Only runs once a chunk has failed, so the row-by-row scan costs nothing
+    # on valid input
+    for i, row in enumerate(chunk):
+        try:
+            for j in columns:
+                int(row[j])
+        except (IndexError, TypeError, ValueError) as exc:
+            return f"row {first_row + i}: missing or non-integer answer ({exc})"
+    return f"rows {first_row}–{first_row + len(chunk) - 1}: missing or non-integer answer"
+
+
+def _score_by_version(versions, tol_idx, cap_idx, first_row):
+    """score_indices() for a chunk whose rows may come from several questionnaire versions."""
+    names, which = np.unique(np.array(versions, dtype=object), return_inverse=True)
+    known = available_versions()
+    for i, version in enumerate(names):
+        if version not in known:
+            row = first_row + int(np.flatnonzero(which == i)[0])
+            raise ValueError(f"row {row}: unknown questionnaire version {version!r} (have {', '.join(known)})")
+    if len(names) == 1:
+        return score_indices(tol_idx, cap_idx, names[0])
+    res = {}
+    for i, version in enumerate(names):
+        rows = np.flatnonzero(which == i)
+        for name, values in score_indices(tol_idx[rows], cap_idx[rows], version).items():
+            res.setdefault(name, np.empty(len(versions), dtype=values.dtype))[rows] = values
+    return res
+
+
+def score_file(in_path, out, chunk_size=50_000, jsonl=False):
+    """Stream in_path through score_indices chunk by chunk; returns rows scored."""
+    header, rows = read_table(in_path)
+    missing = [f for f in TOL_FIELDS + CAP_FIELDS if f not in header]
+    if missing:
+        raise ValueError(f"{in_path}: missing answer columns {', '.join(missing)}")
+    tol_cols = [header.index(f) for f in TOL_FIELDS]
+    cap_cols = [header.index(f) for f in CAP_FIELDS]
+    extra = [j for j, name in enumerate(header) if name not in TOL_FIELDS + CAP_FIELDS]
+    version_col = header.index("questionnaire_version") if "questionnaire_version" in header else None
+    out_header = [header[j] for j in extra] + RESULT_FIELDS
+
+    writer = None
+    if not jsonl:
+        writer = csv.writer(out)
+        writer.writerow(out_header)
+
+    scored = 0
+    for chunk in _chunks(rows, chunk_size):
+        tol_idx = _answer_matrix(chunk, tol_cols, scored + 1)
+        cap_idx = _answer_matrix(chunk, cap_cols, scored + 1)
+        if version_col is None:
+            res = score_indices(tol_idx, cap_idx)
+        else:
+            res = _score_by_version([row[version_col] for row in chunk], tol_idx, cap_idx, scored + 1)
+        columns = [[row[j] for row in chunk] for j in extra] + [
+            res["tol_total"].tolist(),
+            _LEVEL_ARRAY[res["tol_level"]],
+            res["cap_total"].tolist(),
+            _LEVEL_ARRAY[res["cap_level"]],
+            _LEVEL_ARRAY[res["overall_label"]],
+            _MESSAGE_ARRAY[res["message"]],
+        ]
+        if jsonl:
+            out.writelines(json.dumps(dict(zip(out_header, r)), ensure_ascii=False) + "\n"
+                           for r in zip(*columns))
+        else:
+            writer.writerows(zip(*columns))
+        scored += len(chunk)
+    return scored
+
+
+# --- Equivalence check against the scalar functions ------------------------------
+class ScoringMismatch(Exception):
+    """The batch path disagrees with the scalar scoring functions."""
+
+
+def mismatches(tol_idx, cap_idx, version=QUESTIONNAIRE_VERSION):
+    """Rows where score_indices differs from score_answers, as (row, field, batch, scalar)."""
+    res = score_indices(tol_idx, cap_idx, version)
+    found = []
+    for i in range(len(tol_idx)):
+        expected = score_answers(list(tol_idx[i]), list(cap_idx[i]), version)
+        got = {
+            "tol_total": int(res["tol_total"][i]), "cap_total": int(res["cap_total"][i]),
+            "tol_level": LEVEL_NAMES[res["tol_level"][i]], "cap_level": LEVEL_NAMES[res["cap_level"][i]],
+            "overall_label": LEVEL_NAMES[res["overall_label"][i]], "message": MESSAGES[res["message"][i]],
+        }
+        found += [(i, field, value, expected[field]) for field, value in got.items() if value != expected[field]]
+    return found
+
+
+def check(samples=20_000, seed=0, versions=None):
+    """Compare the batch path with the scalar functions; raises ScoringMismatch.
+
+    Every reachable (tolerance, capacity) total pair is checked exhaustively,
+    then random answer sheets are scored both ways for every questionnaire
+    version.
+    """
+    totals = np.arange(0, 46)   # includes totals outside 8–40 on purpose
+    tol, cap = (a.ravel() for a in np.meshgrid(totals, totals))
+    tol_level, cap_level = level_codes(tol), level_codes(cap)
+    msg = message_codes(tol, cap)
+    for i in range(tol.size):
+        t, c = int(tol[i]), int(cap[i])
+        if (TOL_LEVELS[tol_level[i]] != interpret_tolerance(t) or CAP_LEVELS[cap_level[i]] != interpret_capacity(c)
+                or MESSAGES[msg[i]] != overall_message(t, c)):
+            raise ScoringMismatch(f"totals tol={t}, cap={c}: level or message differs")
+
+    rng = np.random.default_rng(seed)
+    checked = tol.size
+    for version in versions or available_versions():
+        tol_idx = rng.integers(0, N_OPTIONS, (samples, len(TOL_FIELDS)))
+        cap_idx = rng.integers(0, N_OPTIONS, (samples, len(CAP_FIELDS)))
+        found = mismatches(tol_idx, cap_idx, version)
+        if found:
+            i, field, got, expected = found[0]
+            raise ScoringMismatch(f"{version}, sample {i}: {field} is {got!r}, scalar scoring gives {expected!r}"
+                                  f" ({len(found)} mismatches)")
+        checked += samples
+    return checked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score stored questionnaire responses in bulk.")
+    parser.add_argument("input", nargs="?", help="CSV or .jsonl file of answer indices")
+    parser.add_argument("-o", "--output", help="output file (.csv or .jsonl); default: CSV on stdout")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="rows scored per NumPy batch")
+    parser.add_argument("--check", action="store_true", help="verify against the scalar scoring functions")
+    parser.add_argument("--seed", type=int, default=0, help="random answer sheets for --check")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        print(f"batch scoring matches scalar scoring on {check(seed=args.seed)} cases")
+        return
+    if not args.input:
+        parser.error("an input file is required unless --check is given")
+
+    jsonl = bool(args.output and args.output.endswith(".jsonl"))
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        n = score_file(args.input, out, args.chunk_size, jsonl=jsonl)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"scored {n} responses", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+# Bulk PDF report regeneration
+# ------------------------------------------------------------------------
+# Rebuilds the PDF report for every stored response (same CSV/JSONL layout as
+# batch_scoring.py, plus client_name and client_email columns) on a process
+# pool sized to the machine, into a ZIP archive or a directory. Workers write
+# each report straight to a file in a staging area (the output directory
+# itself, or a temporary directory next to a ZIP), so PDFs never travel back
+# through the pool: the main process only renames them into place or copies
+# them into the archive in chunks. Rows with a questionnaire_version column (as
+# exported from the submission store) are rebuilt with that version's wording
+# and scoring; other rows use the current questionnaire.
+#
+#   python -m risk_core.bulk_reports responses.csv -o reports.zip
+#   python -m risk_core.bulk_reports responses.jsonl -o reports/ --workers 8
+#
+# Progress is checkpointed next to the output (<output>.checkpoint.json), so an
+# interrupted run picks up where it stopped when started again with the same
+# output and an unchanged input file (the checkpoint records its SHA-256). For
+# ZIP output the checkpoint also records where the last checkpointed entry
+# ends; a resumed run cuts the archive back to that point and rebuilds its
+# index before appending. A run that finishes deletes its checkpoint, so the
+# next one regenerates everything (e.g. after a wording or branding change).
+#
+# Rows with missing or out-of-range answers, an unknown questionnaire version
+# or an id seen earlier in the input, and reports that fail to build, are
+# skipped and listed at the end; they do not stop the run.
+import argparse
+import hashlib
+import json
+import os
+import re
+import resource
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .batch_scoring import TOL_FIELDS, CAP_FIELDS, read_table
+from .pdf_output import CHUNK_SIZE
+from .questionnaire import QUESTIONNAIRE_VERSION, available_versions, load
+from .report import build_report, report_assets
+
+
+# --- Input ------------------------------------------------------------------------
+def _answers(row, col, fields, section):
+    idx = []
+    for field, q in zip(fields, section.questions):
+        try:
+            i = int(row[col[field]])
+        except (IndexError, TypeError, ValueError):
+            raise ValueError(f"{field}: missing or non-integer answer") from None
+        if not 0 <= i < len(q.options):
+            raise ValueError(f"{field}: answer index {i} outside 0–{len(q.options) - 1}")
+        idx.append(i)
+    return idx
+
+
+def iter_jobs(path, invalid=None):
+    """Yield (report_id, client_name, client_email, tol_idx, cap_idx, version) per row.
+
+    Invalid rows raise ValueError, or are skipped and appended to `invalid` as
+    (report_id, reason) when a list is given.
+    """
+    header, rows = read_table(path)
+    missing = [f for f in ["client_name", "client_email"] + TOL_FIELDS + CAP_FIELDS if f not in header]
+    if missing:
+        raise ValueError(f"{path}: missing columns {', '.join(missing)}")
+    col = {name: j for j, name in enumerate(header)}
+    versions = set(available_versions())
+    seen = set()
+    for n, row in enumerate(rows, 1):
+        report_id = str(row[col["id"]]) if "id" in col else str(n)
+        try:
+            # Ids name the output files and the checkpoint entries
+            if report_id in seen:
+                raise ValueError("duplicate id")
+            seen.add(report_id)
+            version = row[col["questionnaire_version"]] if "questionnaire_version" in col else QUESTIONNAIRE_VERSION
+            if version not in versions:
+                raise ValueError(f"unknown questionnaire version {version!r}")
+            questionnaire = load(version)
+            job = (
+                report_id,
+                str(row[col["client_name"]]),
+                str(row[col["client_email"]]),
+                _answers(row, col, TOL_FIELDS, questionnaire["tol"]),
+                _answers(row, col, CAP_FIELDS, questionnaire["cap"]),
+                version,
+            )
+        except (IndexError, ValueError) as exc:
+            if invalid is None:
+                raise ValueError(f"row {n} (id {report_id}): {exc}") from None
+            invalid.append((report_id, str(exc)))
+            continue
+        yield job
+
+
+def _slug(text, default):
+    return re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_") or default
+
+
+def report_filename(report_id, client_name):
+    # Both parts come from the input, so neither may add a path separator or
+    # "..". Slugging maps ids like "a/b" and "a_b" to the same text, so a short
+    # hash of the raw id keeps the names of distinct ids apart.
+    tag = hashlib.sha256(report_id.encode("utf-8")).hexdigest()[:8]
+    return f"{_slug(report_id, 'row')}_{_slug(client_name, 'client')}_{tag}.pdf"
+
+
+# --- Worker -----------------------------------------------------------------------
+def _render(job, staging):
+    report_id, client_name, client_email, tol_idx, cap_idx, version = job
+    name = report_filename(report_id, client_name)
+    # A staging file of its own per job, so concurrent jobs never share one;
+    # with directory output the staging area is the output directory, so a
+    # failed build must not leave its part file behind
+    fd, part = tempfile.mkstemp(suffix=".part", prefix=".", dir=staging)
+    start = time.perf_counter()
+    try:
+        with open(fd, "wb") as f:
+            build_report(client_name, client_email, tol_idx, cap_idx, version, out=f)
+    except BaseException:
+        os.unlink(part)
+        raise
+    return report_id, name, part, time.perf_counter() - start
+
+
+# --- Output -----------------------------------------------------------------------
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Checkpoint:
+    """Reports already written for one input file; a checkpoint for any other input is ignored."""
+
+    def __init__(self, path, input_hash):
+        self.path = path
+        self.input_hash = input_hash
+        self.done = set()
+        self.zip_data_end = None
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("input_sha256") == input_hash:
+                self.done = set(state["done"])
+                self.zip_data_end = state.get("zip_data_end")
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"input_sha256": self.input_hash, "done": sorted(self.done),
+                       "zip_data_end": self.zip_data_end}, f)
+        os.replace(tmp, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def _reindex_zip(path, data_end):
+    """Cut a ZIP back to data_end and rebuild its index from the local headers.
+
+    Needed because an interrupted archive may have no central directory, or
+    one that lists entries written after the last checkpoint.
+    """
+    infos = []
+    with open(path, "r+b") as f:
+        f.truncate(data_end)
+        offset = 0
+        while offset < data_end:
+            f.seek(offset)
+            (sig, _, _, flags, method, dostime, dosdate, crc, csize, usize, name_len, extra_len) = \
+                struct.unpack(zipfile.structFileHeader, f.read(zipfile.sizeFileHeader))
+            if sig != zipfile.stringFileHeader:
+                raise zipfile.BadZipFile(f"{path}: no entry header at offset {offset}")
+            name = f.read(name_len).decode("utf-8" if flags & 0x800 else "cp437")
+            info = zipfile.ZipInfo(name, (
+                (dosdate >> 9) + 1980, (dosdate >> 5) & 0xF, dosdate & 0x1F,
+                dostime >> 11, (dostime >> 5) & 0x3F, (dostime & 0x1F) * 2,
+            ))
+            info.flag_bits, info.compress_type, info.CRC = flags, method, crc
+            info.compress_size, info.file_size, info.header_offset = csize, usize, offset
+            infos.append(info)
+            offset += zipfile.sizeFileHeader + name_len + extra_len + csize
+    return infos
+
+
+class ZipSink:
+    def __init__(self, path, checkpoint):
+        self.path = path
+        self.checkpoint = checkpoint
+        if checkpoint.zip_data_end is not None and os.path.exists(path):
+            infos = _reindex_zip(path, checkpoint.zip_data_end)
+            # Opening the cut-down file in append mode writes new entries after
+            # the recovered ones; listing those here puts them back in the
+            # central directory written on close
+            self._zip = zipfile.ZipFile(path, "a", compression=zipfile.ZIP_DEFLATED)
+            for info in infos:
+                self._zip.filelist.append(info)
+                self._zip.NameToInfo[info.filename] = info
+        else:
+            checkpoint.done.clear()
+            self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._pending = []
+        self._staging = tempfile.TemporaryDirectory(prefix=".staging-", dir=os.path.dirname(os.path.abspath(path)))
+        self.staging = self._staging.name
+
+    def write(self, report_id, name, part):
+        with open(part, "rb") as src, self._zip.open(name, "w") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        os.unlink(part)
+        self._pending.append(report_id)
+
+    def commit(self):
+        # Entries are complete on disk up to start_dir once flushed; the central
+        # directory is only written on close and is rebuilt on resume
+        self._zip.fp.flush()
+        os.fsync(self._zip.fp.fileno())
+        self.checkpoint.zip_data_end = self._zip.start_dir
+        self.checkpoint.done.update(self._pending)
+        self.checkpoint.save()
+        self._pending = []
+
+    def close(self):
+        self.commit()
+        self._zip.close()
+        self._staging.cleanup()
+
+
+class DirectorySink:
+    def __init__(self, path, checkpoint):
+        self.path = path
+        self.checkpoint = checkpoint
+        os.makedirs(path, exist_ok=True)
+        self._pending = []
+        self.staging = path     # same filesystem, so the rename below is atomic
+
+    def write(self, report_id, name, part):
+        os.replace(part, os.path.join(self.path, name))
+        self._pending.append(report_id)
+
+    def commit(self):
+        self.checkpoint.done.update(self._pending)
+        self.checkpoint.save()
+        self._pending = []
+
+    def close(self):
+        self.commit()
+
+
+# --- Driver -----------------------------------------------------------------------
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def peak_rss_mib():
+    # ru_maxrss is in KiB on Linux; children covers the pool workers
+    parent = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return parent / 1024, children / 1024
+
+
+def run(input_path, output, workers=None, checkpoint_every=100):
+    workers = workers or os.cpu_count() or 1
+    checkpoint = Checkpoint(output.rstrip("/\\") + ".checkpoint.json", file_hash(input_path))
+    sink = ZipSink(output, checkpoint) if output.endswith(".zip") else DirectorySink(output, checkpoint)
+    skipped = len(checkpoint.done)
+    invalid, failed = [], []
+    jobs = (job for job in iter_jobs(input_path, invalid) if job[0] not in checkpoint.done)
+    latencies = []
+    start = time.perf_counter()
+    finished_run = False
+
+    # Keep only a couple of jobs per worker in flight so finished PDFs are
+    # written out as they arrive instead of piling up in memory
+    try:
+        with ProcessPoolExecutor(workers, initializer=report_assets) as pool:
+            in_flight = {}      # future -> report id
+            exhausted = False
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < workers * 2:
+                    job = next(jobs, None)
+                    if job is None:
+                        exhausted = True
+                    else:
+                        in_flight[pool.submit(_render, job, sink.staging)] = job[0]
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    report_id = in_flight.pop(future)
+                    try:
+                        report_id, name, part, elapsed = future.result()
+                    except Exception as exc:
+                        failed.append((report_id, f"{type(exc).__name__}: {exc}"))
+                        continue
+                    sink.write(report_id, name, part)
+                    latencies.append(elapsed)
+                    if len(latencies) % checkpoint_every == 0:
+                        sink.commit()
+        finished_run = True
+    finally:
+        # Reports already written are kept even if the run was interrupted
+        sink.close()
+    if finished_run:
+        checkpoint.remove()
+
+    return {
+        "reports": len(latencies),
+        "skipped": skipped,
+        "invalid": invalid,
+        "failed": failed,
+        "seconds": time.perf_counter() - start,
+        "latencies": latencies,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate PDF reports for stored responses.")
+    parser.add_argument("input", help="CSV or .jsonl file of stored responses")
+    parser.add_argument("-o", "--output", required=True, help="a .zip file or an output directory")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="reports between checkpoints")
+    args = parser.parse_args(argv)
+
+    stats = run(args.input, args.output, args.workers, args.checkpoint_every)
+    n, secs, lat = stats["reports"], stats["seconds"], stats["latencies"]
+    parent_rss, worker_rss = peak_rss_mib()
+    done = f", {stats['skipped']} already done" if stats["skipped"] else ""
+    print(f"{n} reports in {secs:.1f} s ({n / secs if secs else 0:.1f} reports/s){done}", file=sys.stderr)
+    if lat:
+        print("per-report latency  "
+              f"p50 {percentile(lat, 50) * 1000:.0f} ms  "
+              f"p95 {percentile(lat, 95) * 1000:.0f} ms  "
+              f"p99 {percentile(lat, 99) * 1000:.0f} ms", file=sys.stderr)
+    print(f"peak RSS  main {parent_rss:.0f} MiB  largest worker {worker_rss:.0f} MiB", file=sys.stderr)
+    for label, rows in (("invalid rows skipped", stats["invalid"]), ("reports that failed", stats["failed"])):
+        if rows:
+            print(f"{len(rows)} {label}:", file=sys.stderr)
+            for report_id, reason in rows:
+                print(f"  {report_id}: {reason}", file=sys.stderr)
+    if stats["invalid"] or stats["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# Vector charts for the PDF report (reportlab.graphics)
+# ------------------------------------------------------------------------
+# box_whisker() draws the Risk & Return box plot straight from the profile
+# statistics (see returns.profile_stats), so the PDF carries a few hundred
+# bytes of drawing operators instead of a raster image, and stays sharp at any
+# zoom. fan_chart() draws the percentile bands of a growth projection (see
+# projections.py) the same way. The returned Drawings are normal platypus
+# flowables.
+#
+# ReportLab is imported inside the functions, as in report.py.
+import math
+
+# Profile colours, in profile order (Conservative → Aggressive)
+PALETTE = ["#1F5C8B", "#ED7D31", "#1E7B34", "#0EA5DB", "#A0318F"]
+FADED = 0.65        # how far non-highlighted profiles are blended towards white
+GRID_STEP = 0.05    # 5% gridlines
+FAN_GRID_STEPS = (10, 20, 25, 50, 100, 200, 500, 1000)     # fan_chart picks the first giving <= 8 lines
+
+
+def _axis_range(profiles):
+    low = min(p["whisker_low"] for p in profiles)
+    high = max(p["whisker_high"] for p in profiles)
+    return math.floor(low / GRID_STEP), math.ceil(high / GRID_STEP)
+
+
+def box_whisker(profiles, highlight=None, width=420, height=220):
+    """Box-and-whisker Drawing of rolling one-year returns, one box per profile.
+
+    `profiles` are dicts with profile, mean, q1, median, q3, whisker_low and
+    whisker_high (fractions). When `highlight` is a profile index, that box
+    is drawn in full colour and the others are faded.
+    """
+    from reportlab.graphics.shapes import Drawing, Line, Rect, String
+    from reportlab.lib import colors
+
+    left, right, top, bottom = 44, 6, 16, 28
+    plot_w, plot_h = width - left - right, height - top - bottom
+    steps_low, steps_high = _axis_range(profiles)
+    y_min, y_max = steps_low * GRID_STEP, steps_high * GRID_STEP
+
+    def y(value):
+        return bottom + (value - y_min) / (y_max - y_min) * plot_h
+
+    d = Drawing(width, height)
+    grid = colors.HexColor("#D9D9D9")
+    for step in range(steps_low, steps_high + 1):
+        value = step * GRID_STEP
+        d.add(Line(left, y(value), left + plot_w, y(value), strokeColor=grid, strokeWidth=0.5))
+        d.add(String(left - 4, y(value) - 2.5, f"{value:.0%}", fontName="Helvetica",
+                     fontSize=7, textAnchor="end", fillColor=colors.HexColor("#595959")))
+
+    slot = plot_w / len(profiles)
+    box_w = slot * 0.62
+    for i, p in enumerate(profiles):
+        base = colors.HexColor(PALETTE[i % len(PALETTE)])
+        chosen = highlight is None or i == highlight
+        fill = base if chosen else colors.linearlyInterpolatedColor(base, colors.white, 0, 1, FADED)
+        stroke = colors.black if highlight == i else fill
+        line_w = 1.2 if highlight == i else 0.75
+        cx = left + slot * (i + 0.5)
+        x0, x1 = cx - box_w / 2, cx + box_w / 2
+
+        # Whiskers and caps
+        d.add(Line(cx, y(p["whisker_low"]), cx, y(p["q1"]), strokeColor=stroke, strokeWidth=line_w))
+        d.add(Line(cx, y(p["q3"]), cx, y(p["whisker_high"]), strokeColor=stroke, strokeWidth=line_w))
+        for end in ("whisker_low", "whisker_high"):
+            d.add(Line(cx - box_w / 4, y(p[end]), cx + box_w / 4, y(p[end]), strokeColor=stroke, strokeWidth=line_w))
+
+        # Box (Q1..Q3), median line and a cross at the mean
+        d.add(Rect(x0, y(p["q1"]), box_w, y(p["q3"]) - y(p["q1"]),
+                   fillColor=fill, strokeColor=stroke, strokeWidth=line_w))
+        d.add(Line(x0, y(p["median"]), x1, y(p["median"]), strokeColor=colors.white, strokeWidth=1))
+        m, s = y(p["mean"]), 3
+        d.add(Line(cx - s, m - s, cx + s, m + s, strokeColor=colors.white, strokeWidth=1))
+        d.add(Line(cx - s, m + s, cx + s, m - s, strokeColor=colors.white, strokeWidth=1))
+
+        d.add(String(cx, bottom - 12, p["profile"], fontName="Helvetica-Bold" if highlight == i else "Helvetica",
+                     fontSize=7.5, textAnchor="middle"))
+        if highlight == i:
+            d.add(String(cx, y(p["whisker_high"]) + 4, "Your profile", fontName="Helvetica-Bold",
+                         fontSize=7.5, textAnchor="middle", fillColor=colors.black))
+    return d
+
+
+def fan_chart(bands, colour=PALETTE[0], width=420, height=200):
+    """Fan Drawing of projected growth: outer and inner percentile bands and the median.
+
+    `bands` has five rows (low, lower-mid, median, upper-mid, high percentile)
+    and one column per year, starting at year 0.
+    """
+    from reportlab.graphics.shapes import Drawing, Line, PolyLine, Polygon, String
+    from reportlab.lib import colors
+
+    left, right, top, bottom = 44, 10, 10, 28
+    plot_w, plot_h = width - left - right, height - top - bottom
+    years = len(bands[0]) - 1
+    span = max(bands[-1]) - min(bands[0])
+    step = next((s for s in FAN_GRID_STEPS if span / s <= 8), FAN_GRID_STEPS[-1])
+    steps_low = math.floor(min(bands[0]) / step)
+    steps_high = math.ceil(max(bands[-1]) / step)
+    y_min, y_max = steps_low * step, steps_high * step
+
+    def x(year):
+        return left + year / years * plot_w
+
+    def y(value):
+        return bottom + (value - y_min) / (y_max - y_min) * plot_h
+
+    d = Drawing(width, height)
+    grid = colors.HexColor("#D9D9D9")
+    label = colors.HexColor("#595959")
+    for s in range(steps_low, steps_high + 1):
+        value = s * step
+        d.add(Line(left, y(value), left + plot_w, y(value), strokeColor=grid, strokeWidth=0.5))
+        d.add(String(left - 4, y(value) - 2.5, f"{value:g}", fontName="Helvetica",
+                     fontSize=7, textAnchor="end", fillColor=label))
+    for year in range(0, years + 1, 1 if years <= 12 else 5):
+        d.add(String(x(year), bottom - 12, str(year), fontName="Helvetica",
+                     fontSize=7, textAnchor="middle", fillColor=label))
+    d.add(String(left + plot_w / 2, bottom - 24, "Years", fontName="Helvetica", fontSize=7.5, textAnchor="middle"))
+
+    base = colors.HexColor(colour)
+    for (low, high), fade in (((0, 4), 0.75), ((1, 3), 0.45)):
+        points = []
+        for year in range(years + 1):
+            points += [x(year), y(bands[high][year])]
+        for year in range(years, -1, -1):
+            points += [x(year), y(bands[low][year])]
+        fill = colors.linearlyInterpolatedColor(base, colors.white, 0, 1, fade)
+        d.add(Polygon(points, fillColor=fill, strokeColor=None, strokeWidth=0))
+    median = []
+    for year in range(years + 1):
+        median += [x(year), y(bands[2][year])]
+    d.add(PolyLine(median, strokeColor=base, strokeWidth=1.5))
+    return d
@@ -0,0 +1,372 @@
+# Opt-in email delivery of PDF reports
+# ------------------------------------------------------------------------
+# Disabled unless RISK_SMTP_HOST is set:
+#   RISK_SMTP_HOST, RISK_SMTP_PORT=25       mail server
+#   RISK_SMTP_USER, RISK_SMTP_PASSWORD      login, if the server needs one
+#   RISK_SMTP_STARTTLS=1                    upgrade the connection with STARTTLS
+#   RISK_MAIL_FROM=reports@localhost        sender address
+#   RISK_OUTBOX_PATH=outbox.db              the delivery queue
+#
+# enqueue() only writes the recipient and the PDF to an SQLite outbox and wakes
+# the worker, so the app never waits on the mail server (or on building the
+# MIME message) and queued reports survive a restart. The worker is one
+# background thread running an asyncio loop: it claims due reports in batches,
+# builds each message as it goes out and sends it over a small pool of SMTP
+# connections that stay open between batches (aiosmtplib, imported by the
+# worker only). A failed send is retried with exponential backoff, except for
+# permanent (5xx) rejections; after MAX_ATTEMPTS the message is marked failed.
+# Addresses are checked and their domains IDNA-encoded before anything is
+# queued, and a message that still cannot be built fails on its own without
+# stopping the worker.
+#
+# Claimed messages are leased, not removed: if the process dies mid-batch they
+# are sent again once the lease runs out, so delivery is at-least-once.
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formataddr, formatdate, make_msgid
+from functools import partial
+
+from . import metrics
+
+SMTP_HOST = os.environ.get("RISK_SMTP_HOST")
+SMTP_PORT = int(os.environ.get("RISK_SMTP_PORT", "25"))
+SMTP_USER = os.environ.get("RISK_SMTP_USER")
+SMTP_PASSWORD = os.environ.get("RISK_SMTP_PASSWORD")
+SMTP_STARTTLS = bool(os.environ.get("RISK_SMTP_STARTTLS"))
+MAIL_FROM = os.environ.get("RISK_MAIL_FROM", "reports@localhost")
+OUTBOX_PATH = os.environ.get("RISK_OUTBOX_PATH", "outbox.db")
+ENABLED = bool(SMTP_HOST)
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 30.0        # seconds before the first retry, doubling after that
+BACKOFF_MAX = 3600.0
+LEASE = 300.0              # a claimed message is retried if not settled within this
+IDLE_CLOSE = 60.0          # close pooled connections after this long without mail
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    queued_at REAL NOT NULL,
+    recipient TEXT NOT NULL,
+    client_name TEXT NOT NULL,
+    pdf BLOB,                                -- cleared once sent
+    status TEXT NOT NULL DEFAULT 'queued',   -- queued | sent | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    sent_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+"""
+
+log = logging.getLogger(__name__)
+
+
+class InvalidMessage(ValueError):
+    """A queued report whose email cannot be built; retrying will not help."""
+
+
+def normalize_address(address):
+    """`address` ready for SMTP, with an IDNA-encoded domain; raises ValueError if unusable.
+
+    The local part must be ASCII: the mailer does not use SMTPUTF8.
+    """
+    local, at, domain = address.strip().rpartition("@")
+    if not at or not local or not domain or any(c.isspace() or c in "<>,;" for c in local + domain):
+        raise ValueError(f"{address!r} is not an email address")
+    if not local.isascii():
+        raise ValueError(f"{address!r}: only ASCII is supported before the @")
+    try:
+        domain = domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        raise ValueError(f"{address!r}: invalid domain") from None
+    return f"{local}@{domain}"
+
+
+def make_message(client_name, client_email, pdf, sender=MAIL_FROM):
+    """The report email as bytes, ready for SMTP."""
+    # The email.mime classes (compat32 policy) build this about three times
+    # faster than EmailMessage, whose header objects dominate the cost
+    msg = MIMEMultipart()
+    msg["Subject"] = "Your Risk Profile Report"
+    msg["From"] = sender
+    msg["To"] = formataddr((client_name, normalize_address(client_email)))
+    msg["Date"] = formatdate(localtime=True)
+    # An explicit domain avoids make_msgid's hostname lookup
+    msg["Message-ID"] = make_msgid(domain=sender.rpartition("@")[2] or "localhost")
+    msg.attach(MIMEText(f"Dear {client_name},\n\nPlease find attached your Risk Profile Report.\n"))
+    attachment = MIMEApplication(pdf, "pdf")
+    attachment.add_header("Content-Disposition", "attachment", filename="Risk_Profile_Report.pdf")
+    msg.attach(attachment)
+    return msg.as_bytes()
+
+
+def backoff(attempts, base=BACKOFF_BASE):
+    """Seconds to wait before retry number `attempts` (1, 2, ...), with jitter."""
+    return min(BACKOFF_MAX, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+def _permanent(exc):
+    from aiosmtplib import SMTPRecipientsRefused, SMTPResponseException
+
+    if isinstance(exc, InvalidMessage):
+        return True
+    if isinstance(exc, SMTPRecipientsRefused):
+        return all(r.code >= 500 for r in exc.recipients)
+    return isinstance(exc, SMTPResponseException) and exc.code >= 500
+
+
+# --- Durable queue ---------------------------------------------------------------
+class Outbox:
+    def __init__(self, path=OUTBOX_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def put(self, recipient, client_name, pdf):
+        """Queue a report for `recipient`; returns the outbox id."""
+        now = time.time()
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "INSERT INTO outbox (queued_at, recipient, client_name, pdf, next_attempt_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (now, recipient, client_name, pdf, now),
+            ).lastrowid
+
+    def claim(self, limit, lease=LEASE):
+        """Lease up to `limit` due reports: [(id, recipient, client_name, pdf, attempts)]."""
+        now = time.time()
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE outbox SET next_attempt_at = ? WHERE id IN ("
+                "  SELECT id FROM outbox WHERE status = 'queued' AND next_attempt_at <= ?"
+                "  ORDER BY next_attempt_at LIMIT ?"
+                ") RETURNING id, recipient, client_name, pdf, attempts",
+                (now + lease, now, limit),
+            ).fetchall()
+
+    def settle(self, sent, retry, failed):
+        """Record a batch: sent ids, retry [(id, attempts, delay, error)], failed [(id, attempts, error)]."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE outbox SET status = 'sent', sent_at = ?, pdf = NULL, attempts = attempts + 1"
+                " WHERE id = ?", [(now, i) for i in sent])
+            self._conn.executemany(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                [(attempts, now + delay, error, i) for i, attempts, delay, error in retry])
+            self._conn.executemany(
+                "UPDATE outbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+                [(attempts, error, i) for i, attempts, error in failed])
+
+    def next_due(self):
+        """When the earliest queued message is due (None if there is none)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'queued'").fetchone()[0]
+
+    def counts(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status"))
+
+    def close(self):
+        self._conn.close()
+
+
+# --- SMTP connection pool ----------------------------------------------------------
+class SMTPPool:
+    def __init__(self, size, **smtp_args):
+        self.size = size
+        self.smtp_args = smtp_args
+        self.opened = 0         # connections made so far, for benchmarks
+        self._conns = [None] * size
+
+    async def _connection(self, slot):
+        import aiosmtplib
+
+        smtp = self._conns[slot]
+        if smtp is None or not smtp.is_connected:
+            smtp = aiosmtplib.SMTP(**self.smtp_args)
+            try:
+                await smtp.connect()
+            except aiosmtplib.SMTPException as exc:
+                # Includes login failures: a server problem, not the message's
+                raise ConnectionError(f"cannot connect to the mail server: {exc}") from exc
+            self._conns[slot] = smtp
+            self.opened += 1
+        return smtp
+
+    async def send(self, slot, sender, recipient, message):
+        import aiosmtplib
+
+        # A pooled connection may have been dropped by the server while idle;
+        # that costs one reconnect, not a retry of the message
+        for reconnect in (False, True):
+            smtp = await self._connection(slot)
+            try:
+                await smtp.sendmail(sender, [recipient], message)
+                return
+            except aiosmtplib.SMTPServerDisconnected:
+                self._conns[slot] = None
+                if reconnect:
+                    raise
+            except (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused):
+                raise       # the server answered, so the connection is still good
+            except Exception:
+                await self._drop(slot)
+                raise
+
+    async def send_all(self, sender, messages, count):
+        """Send `count` (id, recipient, build) from an iterable over the pool.
+
+        Each connection takes the next entry when it is free and calls
+        build() for the message bytes, so messages are built only as they go
+        out. A build error becomes that message's InvalidMessage result.
+        Returns {id: exception or None}.
+        """
+        results = {}
+        pending = iter(messages)
+
+        async def drain(slot):
+            for outbox_id, recipient, build in pending:
+                try:
+                    try:
+                        message = build()
+                    except Exception as exc:
+                        raise InvalidMessage(f"cannot build the message: {type(exc).__name__}: {exc}") from exc
+                    with metrics.span("email_send"):
+                        await self.send(slot, sender, recipient, message)
+                    results[outbox_id] = None
+                except Exception as exc:
+                    results[outbox_id] = exc
+
+        await asyncio.gather(*(drain(slot) for slot in range(min(self.size, count))))
+        return results
+
+    async def _drop(self, slot):
+        smtp, self._conns[slot] = self._conns[slot], None
+        if smtp is not None and smtp.is_connected:
+            try:
+                await smtp.quit()
+            except Exception:
+                smtp.close()
+
+    async def close(self):
+        for slot in range(self.size):
+            await self._drop(slot)
+
+
+# --- Delivery worker ---------------------------------------------------------------
+class Mailer:
+    def __init__(self, path=OUTBOX_PATH, host=SMTP_HOST, port=SMTP_PORT, username=SMTP_USER,
+                 password=SMTP_PASSWORD, start_tls=SMTP_STARTTLS, sender=MAIL_FROM,
+                 connections=4, batch_size=100, poll_interval=5.0, backoff_base=BACKOFF_BASE):
+        self.outbox = Outbox(path)
+        self.sender = sender
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.backoff_base = backoff_base
+        self.pool = SMTPPool(connections, hostname=host, port=port, username=username,
+                             password=password, start_tls=start_tls)
+        self._loop = None
+        self._wake = None
+        self._stopping = False
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=asyncio.run, args=(self._main(),), name="mail-worker", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def enqueue(self, client_name, client_email, pdf):
+        """Queue the report for delivery and return its outbox id; never touches the network.
+
+        Raises ValueError (see normalize_address) if client_email cannot be mailed to.
+        """
+        outbox_id = self.outbox.put(normalize_address(client_email), client_name, pdf)
+        metrics.inc("emails_queued_total")
+        self._loop.call_soon_threadsafe(self._wake.set)
+        return outbox_id
+
+    def stop(self):
+        """Finish the current batch, close the SMTP connections and stop the worker."""
+        def request_stop():
+            self._stopping = True
+            self._wake.set()
+        self._loop.call_soon_threadsafe(request_stop)
+        self._thread.join()
+        self.outbox.close()
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._started.set()
+        outbox = Outbox(self.outbox.path)
+        idle_since = None
+        try:
+            while not self._stopping:
+                self._wake.clear()
+                batch = outbox.claim(self.batch_size)
+                if batch:
+                    idle_since = None
+                    messages = ((outbox_id, recipient, partial(make_message, name, recipient, pdf, self.sender))
+                                for outbox_id, recipient, name, pdf, _ in batch)
+                    self._settle(outbox, batch, await self.pool.send_all(self.sender, messages, len(batch)))
+                    continue
+                if idle_since is None:
+                    idle_since = time.monotonic()
+                elif time.monotonic() - idle_since > IDLE_CLOSE:
+                    await self.pool.close()
+                due = outbox.next_due()
+                timeout = self.poll_interval if due is None else min(self.poll_interval, max(0.0, due - time.time()))
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        except Exception:
+            log.exception("mail worker stopped")
+            raise
+        finally:
+            await self.pool.close()
+            outbox.close()
+
+    def _settle(self, outbox, batch, results):
+        sent, retry, failed = [], [], []
+        for outbox_id, recipient, _, _, attempts in batch:
+            exc = results[outbox_id]
+            if exc is None:
+                sent.append(outbox_id)
+                continue
+            attempts += 1
+            error = f"{type(exc).__name__}: {exc}"
+            if _permanent(exc) or attempts >= MAX_ATTEMPTS:
+                log.warning("giving up on report email %d to %s: %s", outbox_id, recipient, error)
+                failed.append((outbox_id, attempts, error))
+            else:
+                retry.append((outbox_id, attempts, backoff(attempts, self.backoff_base), error))
+        outbox.settle(sent, retry, failed)
+        metrics.inc("emails_sent_total", len(sent))
+        metrics.inc("email_retries_total", len(retry))
+        metrics.inc("emails_failed_total", len(failed))
+
+
+_mailer = None
+_mailer_lock = threading.Lock()
+
+
+def get_mailer():
+    """The process-wide mailer, started on first use."""
+    global _mailer
+    with _mailer_lock:
+        if _mailer is None:
+            _mailer = Mailer()
+        return _mailer
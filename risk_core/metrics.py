@@ -0,0 +1,197 @@
+# Opt-in timing spans and counters
+# ------------------------------------------------------------------------
+# Disabled unless RISK_METRICS is set, in which case:
+#   RISK_METRICS_PORT=9464         serve Prometheus text format on :9464/metrics
+#   RISK_METRICS_HOST=127.0.0.1    address to serve it on (0.0.0.0 for all)
+#   RISK_METRICS_LOG_INTERVAL=60   log a JSON snapshot every 60 s (logger
+#                                  "risk_core.metrics", level INFO; to stderr
+#                                  unless that logger already has a handler)
+# Either or both can be used; with neither, the numbers are still available
+# from snapshot() and render_prometheus().
+#
+# When disabled, span() hands back one shared no-op context manager, timed()
+# returns the function undecorated and inc() returns straight away, so the
+# instrumented code paths cost next to nothing.
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+ENABLED = bool(os.environ.get("RISK_METRICS"))
+PREFIX = "riskq"
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SESSION_WINDOW = 5 * 60    # a session counts as active for 5 min after its last rerun
+
+_lock = threading.Lock()
+_spans = {}       # name -> ([count per bucket..., +Inf], total seconds)
+_counters = {}    # name -> value
+_gauges = {}      # name -> (zero-argument callable, Prometheus type)
+_sessions = {}    # session id -> last seen (monotonic)
+_NOOP = nullcontext()
+_started = False
+
+
+# --- Recording ----------------------------------------------------------------------
+def observe(name, seconds):
+    with _lock:
+        counts, total = _spans.get(name) or ([0] * (len(BUCKETS) + 1), 0.0)
+        counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        _spans[name] = (counts, total + seconds)
+
+
+@contextmanager
+def _span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def span(name):
+    return _span(name) if ENABLED else _NOOP
+
+
+def timed(name):
+    """Decorator form of span(); a no-op when metrics are disabled."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def inc(name, amount=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def gauge(name, fn, kind="gauge"):
+    """Register a value read at export time, e.g. a cache's hit count.
+
+    Use kind="counter" for values that only ever go up.
+    """
+    _gauges[name] = (fn, kind)
+
+
+def touch_session(session_id):
+    if not ENABLED:
+        return
+    with _lock:
+        _sessions[session_id] = time.monotonic()
+
+
+def _active_sessions():
+    cutoff = time.monotonic() - SESSION_WINDOW
+    with _lock:
+        for sid in [sid for sid, seen in _sessions.items() if seen < cutoff]:
+            del _sessions[sid]
+        return len(_sessions)
+
+
+gauge("active_sessions", _active_sessions)
+
+
+# --- Export -------------------------------------------------------------------------
+def _read_gauges():
+    return {name: (fn(), kind) for name, (fn, kind) in list(_gauges.items())}
+
+
+def snapshot():
+    gauges = {name: value for name, (value, _) in _read_gauges().items()}
+    with _lock:
+        spans = {
+            name: {"count": sum(counts), "sum_s": round(total, 6)}
+            for name, (counts, total) in _spans.items()
+        }
+        return {"spans": spans, "counters": dict(_counters), "gauges": gauges}
+
+
+def render_prometheus():
+    gauges = _read_gauges()
+    lines = [f"# TYPE {PREFIX}_span_seconds histogram"]
+    with _lock:
+        for name, (counts, total) in sorted(_spans.items()):
+            running = 0
+            for le, count in zip(BUCKETS + ("+Inf",), counts):
+                running += count
+                lines.append(f'{PREFIX}_span_seconds_bucket{{span="{name}",le="{le}"}} {running}')
+            lines.append(f'{PREFIX}_span_seconds_sum{{span="{name}"}} {total:.6f}')
+            lines.append(f'{PREFIX}_span_seconds_count{{span="{name}"}} {running}')
+        for name, value in sorted(_counters.items()):
+            lines.append(f"# TYPE {PREFIX}_{name} counter")
+            lines.append(f"{PREFIX}_{name} {value}")
+    for name, (value, kind) in sorted(gauges.items()):
+        lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+        lines.append(f"{PREFIX}_{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _handler():
+    # http.server pulls in a lot of the stdlib; only load it when serving
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def _log_forever(interval):
+    import json
+    import logging
+
+    log = logging.getLogger(__name__)
+    if not log.handlers:
+        # Nothing configures logging under `streamlit run` (the root logger is
+        # at WARNING with no handler), so give the snapshots their own
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        log.addHandler(handler)
+        log.propagate = False
+    log.setLevel(logging.INFO)
+    while True:
+        time.sleep(interval)
+        log.info(json.dumps(snapshot()))
+
+
+def start_exporters():
+    """Start the configured exporters once per process; safe to call on every rerun."""
+    global _started
+    if not ENABLED or _started:
+        return
+    with _lock:
+        if _started:
+            return
+        _started = True
+    port = os.environ.get("RISK_METRICS_PORT")
+    if port:
+        from http.server import ThreadingHTTPServer
+
+        host = os.environ.get("RISK_METRICS_HOST", "127.0.0.1")
+        server = ThreadingHTTPServer((host, int(port)), _handler())
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    interval = os.environ.get("RISK_METRICS_LOG_INTERVAL")
+    if interval:
+        threading.Thread(target=_log_forever, args=(float(interval),), name="metrics-log", daemon=True).start()
@@ -0,0 +1,70 @@
+# Report output targets
+# ------------------------------------------------------------------------
+# ReportLab assembles a finished PDF as one bytes object and hands it to the
+# write() of the file it was given, once. generate_pdf(out=...) passes its
+# target straight through, so the document is never copied on the way out:
+#
+#   out=None               the bytes object ReportLab made is returned as is
+#                          (no BytesIO in between, no getvalue() copy)
+#   out=<binary stream>    written to it: an open file, spooled(), a socket or
+#                          archive entry opened for writing, ...
+#   out=<writable buffer>  copied into a bytearray / memoryview / mmap the
+#                          caller sized; ValueError if it is too small
+#
+# The writers below count what went through them, which is what
+# generate_pdf returns for the last two.
+import tempfile
+
+SPOOL_MAX = 1 << 20     # spooled() keeps up to 1 MiB in memory, then moves to disk
+CHUNK_SIZE = 64 * 1024  # for copying finished reports between files
+
+
+class _Capture:
+    def __init__(self):
+        self.data = b""
+        self.size = 0
+
+    def write(self, data):
+        self.data = data if not self.data else self.data + data
+        self.size += len(data)
+        return len(data)
+
+
+class _StreamWriter:
+    def __init__(self, stream):
+        self.stream = stream
+        self.size = 0
+        self.name = getattr(stream, "name", None)
+
+    def write(self, data):
+        self.stream.write(data)
+        self.size += len(data)
+        return len(data)
+
+
+class _BufferWriter:
+    def __init__(self, buffer):
+        self.view = memoryview(buffer).cast("B")
+        self.size = 0
+
+    def write(self, data):
+        end = self.size + len(data)
+        if end > len(self.view):
+            raise ValueError(f"output buffer too small: the report needs {end} bytes, it has {len(self.view)}")
+        self.view[self.size:end] = data
+        self.size = end
+        return len(data)
+
+
+def writer(out):
+    """The file object ReportLab should write to for an `out` target."""
+    if out is None:
+        return _Capture()
+    if hasattr(out, "write"):
+        return _StreamWriter(out)
+    return _BufferWriter(out)
+
+
+def spooled(max_size=SPOOL_MAX):
+    """A temporary file kept in memory up to max_size bytes, then on disk."""
+    return tempfile.SpooledTemporaryFile(max_size, mode="w+b")
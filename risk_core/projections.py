@@ -0,0 +1,83 @@
+# Monte Carlo growth projections per risk profile
+# ------------------------------------------------------------------------
+# Answers "what could my money look like in N years?" for each profile in the
+# report's Risk & Return table. Monthly returns are drawn as one NumPy matrix
+# (paths × months) from a lognormal model with the profile's historical
+# average return and volatility, compounded with a single cumsum along the
+# months, and reduced to percentile bands at every year end.
+#
+# Results are memoized per (profile, years, seed), so each process pays for a
+# simulation once and every later report reuses it. The figures are growth of
+# 100 invested, before fees and inflation.
+#
+#   python -m risk_core.projections [--years 10] [--seed 2025]
+import argparse
+from functools import lru_cache
+
+import numpy as np
+
+PATHS = 10_000
+STEPS_PER_YEAR = 12
+PERCENTILES = (5, 25, 50, 75, 95)
+YEARS = 10
+SEED = 2025
+
+
+def lognormal_params(mean, volatility):
+    """Annual (mu, sigma) of log returns whose simple returns have this mean and volatility."""
+    sigma2 = np.log1p(volatility ** 2 / (1 + mean) ** 2)
+    return np.log1p(mean) - sigma2 / 2, np.sqrt(sigma2)
+
+
+def simulate(mean, volatility, years, seed, paths=PATHS, steps_per_year=STEPS_PER_YEAR):
+    """Growth of 1 at every year end, shaped (paths, years + 1)."""
+    mu, sigma = lognormal_params(mean, volatility)
+    dt = 1 / steps_per_year
+    rng = np.random.default_rng(seed)
+    log_steps = rng.standard_normal((paths, years * steps_per_year))
+    log_steps *= sigma * np.sqrt(dt)
+    log_steps += mu * dt
+    np.cumsum(log_steps, axis=1, out=log_steps)     # in place: the matrix is the largest allocation
+    log_growth = log_steps[:, steps_per_year - 1::steps_per_year]
+    return np.exp(np.concatenate((np.zeros((paths, 1)), log_growth), axis=1))
+
+
+def _profile(name):
+    from .report import profile_stats
+
+    for p in profile_stats():
+        if p["profile"] == name:
+            return p
+    raise KeyError(f"unknown profile {name!r}")
+
+
+@lru_cache(maxsize=None)
+def project(profile, years=YEARS, seed=SEED):
+    """Percentile bands of 100 invested in `profile`, shaped (len(PERCENTILES), years + 1).
+
+    Row i holds the PERCENTILES[i] outcome at the end of each year (column 0 is
+    the start). The array is shared between callers, so it is read-only.
+    """
+    p = _profile(profile)
+    bands = 100 * np.percentile(simulate(p["mean"], p["volatility"], years, seed), PERCENTILES, axis=0)
+    bands.flags.writeable = False
+    return bands
+
+
+def main(argv=None):
+    from .report import profile_stats
+
+    parser = argparse.ArgumentParser(description="Monte Carlo growth of 100 invested per risk profile.")
+    parser.add_argument("--years", type=int, default=YEARS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args(argv)
+
+    print(f"Value of 100 after {args.years} years, {PATHS} paths")
+    print(f"{'Profile':18s} " + " ".join(f"{f'P{q}':>7s}" for q in PERCENTILES))
+    for p in profile_stats():
+        bands = project(p["profile"], args.years, args.seed)
+        print(f"{p['profile']:18s} " + " ".join(f"{v:7.1f}" for v in bands[:, -1]))
+
+
+if __name__ == "__main__":
+    main()
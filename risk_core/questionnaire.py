@@ -0,0 +1,133 @@
+# Questionnaire data models and definitions
+# ------------------------------------------------------------------------
+# Each questionnaire version is a JSON file in questionnaires/<version>.json:
+#
+#   {"version": "2025.10",
+#    "sections": [{"key": "tol", "title": "Risk Tolerance",
+#                  "bands": [{"min": 8, "level": "Conservative", "description": "..."}, ...],
+#                  "questions": [{"prompt": "...", "options": [{"text": "...", "score": 5}, ...]}]},
+#                 ...]}
+#
+# load(version) compiles a file once per process into frozen Questionnaire /
+# Section / Question objects shared by every session: per-option scores and
+# band edges are precomputed, so scoring an answer is a tuple lookup. Old versions stay loadable, so a stored
+# submission is always re-scored against the wording it was answered with.
+import bisect
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+DEFINITIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "questionnaires")
+
+
+# --- Data Models ----------------------------------------------------------------
+@dataclass(frozen=True)
+class Question:
+    prompt: str
+    options: Tuple[str, ...]
+    scores: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class Section:
+    key: str
+    title: str
+    questions: Tuple[Question, ...]
+    band_edges: Tuple[int, ...]       # lowest total of each level band, ascending
+    levels: Tuple[str, ...]
+    descriptions: Tuple[str, ...]
+
+    def score(self, indices):
+        return sum(q.scores[i] for q, i in zip(self.questions, indices))
+
+    def interpret(self, total):
+        """(level, description) for a section total."""
+        # Totals below the first edge give index -1, i.e. the last band, which
+        # is what the original if/elif chain's else branch did
+        band = bisect.bisect_right(self.band_edges, total) - 1
+        return self.levels[band], self.descriptions[band]
+
+
+@dataclass(frozen=True)
+class Questionnaire:
+    version: str
+    sections: Tuple[Section, ...]
+
+    def __getitem__(self, key):
+        for section in self.sections:
+            if section.key == key:
+                return section
+        raise KeyError(key)
+
+    @property
+    def size(self):
+        return sum(len(s.questions) for s in self.sections)
+
+    def span(self, key):
+        """(start, stop) positions of a section's questions when all sections are numbered in order."""
+        start = 0
+        for section in self.sections:
+            if section.key == key:
+                return start, start + len(section.questions)
+            start += len(section.questions)
+        raise KeyError(key)
+
+
+# --- Loading and compiling ------------------------------------------------------
+def _compile_section(data, where):
+    questions = []
+    for n, q in enumerate(data["questions"], 1):
+        options = tuple(o["text"] for o in q["options"])
+        if len(set(options)) != len(options):
+            raise ValueError(f"{where}, question {n}: option texts must be unique")
+        questions.append(Question(q["prompt"], options, tuple(int(o["score"]) for o in q["options"])))
+
+    bands = data["bands"]
+    edges = tuple(int(b["min"]) for b in bands)
+    if list(edges) != sorted(set(edges)):
+        raise ValueError(f"{where}: band minimums must be strictly ascending")
+    return Section(
+        key=data["key"],
+        title=data["title"],
+        questions=tuple(questions),
+        band_edges=edges,
+        levels=tuple(b["level"] for b in bands),
+        descriptions=tuple(b["description"] for b in bands),
+    )
+
+
+def compile_definition(data):
+    """Build a Questionnaire from a parsed definition; raises ValueError if it is malformed."""
+    version = data["version"]
+    sections = tuple(_compile_section(s, f"{version}/{s['key']}") for s in data["sections"])
+    return Questionnaire(version, sections)
+
+
+def available_versions():
+    return sorted(name[:-5] for name in os.listdir(DEFINITIONS_DIR) if name.endswith(".json"))
+
+
+@lru_cache(maxsize=None)
+def load(version):
+    """The compiled questionnaire for `version`, built on first use."""
+    path = os.path.join(DEFINITIONS_DIR, f"{version}.json")
+    if not os.path.exists(path):
+        raise KeyError(f"unknown questionnaire version {version!r} (have {', '.join(available_versions())})")
+    with open(path, encoding="utf-8") as f:
+        questionnaire = compile_definition(json.load(f))
+    if questionnaire.version != version:
+        raise ValueError(f"{path} declares version {questionnaire.version!r}")
+    return questionnaire
+
+
+# --- Current questionnaire ------------------------------------------------------
+# Changing wording, options or scoring means adding a new definition file and
+# pointing this at it, so cached and stored reports built from an older
+# questionnaire are never reused and can still be re-scored.
+QUESTIONNAIRE_VERSION = "2025.10"
+
+current = load(QUESTIONNAIRE_VERSION)
+risk_tolerance = current["tol"]
+risk_capacity = current["cap"]
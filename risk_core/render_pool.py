@@ -0,0 +1,85 @@
+# Background PDF rendering
+# ------------------------------------------------------------------------
+# Reports are built on a small process-wide worker pool so a Streamlit script
+# run never waits on ReportLab. A session asks for its report on every rerun:
+# the first request starts the job, later ones pick up the finished bytes from
+# the report cache. Identical requests share one in-flight job, and once
+# max_pending jobs are queued or running new work is turned away ("busy")
+# until a slot frees up, rather than letting the queue grow without bound.
+# The cache counts a miss only when a request starts a build, so the polls of
+# a session waiting for its report do not inflate report_cache_misses_total.
+# A report whose build fails is retried on later requests up to max_attempts
+# times, after which it is reported as "failed" instead of being rebuilt on
+# every poll.
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .report_cache import report_cache
+
+READY, PENDING, BUSY, FAILED = "ready", "pending", "busy", "failed"
+
+log = logging.getLogger(__name__)
+
+
+class RenderPool:
+    def __init__(self, max_workers=None, max_pending=32, max_attempts=3, max_failed=256, cache=report_cache):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.max_failed = max_failed
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="render")
+        self._in_flight = {}    # report key -> Future
+        self._failures = {}     # report key -> (failed attempts, last exception)
+        self._lock = threading.Lock()
+
+    def request(self, key, build, *args):
+        """Return (state, pdf). pdf is only set when state is READY.
+
+        Once max_attempts jobs for this key have failed the state is FAILED,
+        with the last exception in place of the pdf, and nothing is rebuilt.
+        """
+        pdf = self.cache.get(key, count_miss=False)
+        if pdf is not None:
+            return READY, pdf
+
+        with self._lock:
+            failure = self._failures.get(key)
+            if failure is not None and failure[0] >= self.max_attempts:
+                return FAILED, failure[1]
+            if key in self._in_flight:
+                return PENDING, None
+            if len(self._in_flight) >= self.max_pending:
+                return BUSY, None
+            self._in_flight[key] = self._executor.submit(self._render, key, build, args)
+        self.cache.record_miss()
+        return PENDING, None
+
+    def _render(self, key, build, args):
+        try:
+            pdf = build(*args)
+            self.cache.put(key, pdf)
+            with self._lock:
+                self._failures.pop(key, None)
+            return pdf
+        except Exception as exc:
+            with self._lock:
+                attempts = self._failures.pop(key, (0, None))[0] + 1
+                # Keep only recent failures, so keys that are never requested
+                # again do not leak memory
+                if len(self._failures) >= self.max_failed:
+                    self._failures.pop(next(iter(self._failures)))
+                self._failures[key] = (attempts, exc)
+            log.warning("report build failed (attempt %d of %d)", attempts, self.max_attempts, exc_info=exc)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+# Single pool shared by all sessions in this process
+render_pool = RenderPool()
@@ -0,0 +1,369 @@
+# PDF report builder (ReportLab)
+# ------------------------------------------------------------------------
+# Everything that looks the same in every report (styles, table styles, the
+# profiles table, one box-and-whisker chart per overall label and the notes)
+# is built once per process by report_assets(); generate_pdf() only creates
+# the client-specific flowables.
+#
+# ReportLab is imported inside the functions that use it, so importing this
+# module (or risk_core) stays cheap for callers that never build a PDF.
+#
+# The profile figures come from returns.py when RISK_MARKET_DATA points at a
+# daily price CSV; otherwise the PROFILES and BOX_STATS tables below are used.
+# The growth projection for the client's profile (projections.py) is simulated
+# and drawn once per profile and process by projection_assets().
+import copy
+import os
+from functools import lru_cache
+from types import SimpleNamespace
+
+from . import metrics, pdf_output
+from .questionnaire import QUESTIONNAIRE_VERSION, load
+from .scoring import LEVELS, score_answers
+
+MARKET_DATA = os.environ.get("RISK_MARKET_DATA")
+HISTORY_YEARS = 20    # per the Notes
+PROJECTION_YEARS = int(os.environ.get("RISK_PROJECTION_YEARS", "10"))
+PROJECTION_MILESTONES = (1, 3, 5, 10, 15, 20, 30)   # table rows, up to PROJECTION_YEARS
+
+DARK_BLUE = "#0E4C74"
+
+PROFILES = [
+    ("Conservative", 9.9, 5.6),
+    ("Mod. Conservative", 10.5, 6.8),
+    ("Moderate", 11.0, 8.4),
+    ("Mod. Aggressive", 11.6, 10.3),
+    ("Aggressive", 12.1, 12.2),
+]
+
+# Rolling one-year return whisker_low, q1, median, q3, whisker_high (%), as
+# plotted in the chart the report used to embed
+BOX_STATS = {
+    "Conservative": (1.0, 6.6, 10.0, 13.3, 18.4),
+    "Mod. Conservative": (-0.8, 6.8, 10.8, 14.5, 20.2),
+    "Moderate": (-3.6, 6.6, 11.3, 16.2, 23.5),
+    "Mod. Aggressive": (-6.0, 6.8, 11.6, 18.0, 27.5),
+    "Aggressive": (-8.6, 6.6, 11.8, 18.9, 31.4),
+}
+BOX_KEYS = ("whisker_low", "q1", "median", "q3", "whisker_high")
+
+NOTES = (
+    "<b>Notes:</b> Each risk profile reflects a different blend of local and global equities "
+    "versus local bonds: Conservative (20% local equity, 10% global equity, 70% local bonds); "
+    "Mod. Conservative (30%/15%/55%); Moderate (40%/20%/40%); "
+    "Mod. Aggressive (50%/25%/25%); Aggressive (60%/30%/10%). "
+    "Results are based on 20 years of daily data using rolling one-year periods."
+)
+
+PROJECTION_NOTE = (
+    "<b>Projections</b> are simulations from the profile's historical average return and "
+    "volatility, not forecasts or guarantees. They ignore fees, taxes and inflation, and "
+    "actual results can fall outside the ranges shown."
+)
+
+
+def profile_stats():
+    """Per-profile mean, volatility and box statistics as fractions, Conservative first."""
+    if MARKET_DATA:
+        from .returns import compute
+
+        return compute(MARKET_DATA, years=HISTORY_YEARS)["profiles"]
+    return [
+        {"profile": name, "mean": mean / 100, "volatility": vol / 100,
+         **{k: v / 100 for k, v in zip(BOX_KEYS, BOX_STATS[name])}}
+        for name, mean, vol in PROFILES
+    ]
+
+
+# --- Static assets (built once per process) ------------------------------------
+@lru_cache(maxsize=None)
+def report_assets():
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.platypus import Paragraph, Table, TableStyle
+
+    from .charts import box_whisker
+
+    dark_blue = colors.HexColor(DARK_BLUE)
+    a = SimpleNamespace()
+
+    a.normal = ParagraphStyle("normal", fontSize=10.5, leading=14)
+    a.h2 = ParagraphStyle("h2", fontSize=13, textColor=dark_blue, spaceBefore=12, spaceAfter=8, alignment=1)
+    a.title = ParagraphStyle("title", fontSize=18, alignment=1, textColor=dark_blue, spaceAfter=10)
+    a.small = ParagraphStyle("small", fontSize=8, leading=10.5, alignment=1)
+
+    a.summary_style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), dark_blue),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("ALIGN", (0, 0), (-1, 0), "CENTER"),     # center header text
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),   # vertical alignment for wrapped text
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.whitesmoke),
+    ])
+    a.msg_style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, -1), colors.whitesmoke),
+        ("BOX", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("LEFTPADDING", (0, 0), (-1, -1), 8),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 8),
+        ("TOPPADDING", (0, 0), (-1, -1), 6),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ])
+    # One style shared by every Q&A box instead of one per question
+    a.qa_style = TableStyle([
+        ("BOX", (0, 0), (-1, -1), 0.75, colors.grey),
+        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.grey),
+        ("BACKGROUND", (0, 1), (-1, 1), colors.whitesmoke),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+        ("TOPPADDING", (0, 0), (-1, -1), 4),
+    ])
+
+    # --- Risk & Return Profiles
+    a.profiles_heading = Paragraph("Risk & Return Profiles", a.h2)
+    pdata = [["Profile", "Hist Average Return", "Hist Annual Volatility"]]
+    stats = profile_stats()
+    for p in stats:
+        pdata.append([p["profile"], f"{p['mean'] * 100:.1f}%", f"{p['volatility'] * 100:.1f}%"])
+
+    a.profiles_table = Table(pdata, colWidths=[140, 120, 120])
+    a.profiles_table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), dark_blue),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("ALIGN", (0, 0), (-1, 0), "CENTER"),    # center header titles
+        ("ALIGN", (1, 1), (-1, -1), "CENTER"),   # center numeric data
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.whitesmoke),
+    ]))
+
+    # --- Box & Whisker chart, one vector drawing per overall label (profile
+    # order matches LEVELS); None covers labels outside LEVELS
+    a.charts = {None: box_whisker(stats)}
+    for i, level in enumerate(LEVELS):
+        a.charts[level] = box_whisker(stats, highlight=i)
+    a.chart_style = TableStyle([
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("TOPPADDING", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 20),
+    ])
+
+    a.projection_heading = Paragraph("Projected Growth", a.h2)
+    a.projection_style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), dark_blue),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTSIZE", (0, 0), (-1, 0), 8.5),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.whitesmoke),
+        ("FONTNAME", (3, 1), (3, -1), "Helvetica-Bold"),   # median column
+    ])
+    a.projection_note = Paragraph(PROJECTION_NOTE, a.small)
+
+    a.tolerance_heading = Paragraph("Risk Tolerance", a.h2)
+    a.capacity_heading = Paragraph("Risk Capacity", a.h2)
+    a.notes = Paragraph(NOTES, a.small)
+    return a
+
+
+@lru_cache(maxsize=None)
+def projection_assets(overall_label):
+    """(intro, chart, table) of the growth projection for a LEVELS label, or None for other labels."""
+    from reportlab.platypus import Paragraph, Table
+
+    from .charts import PALETTE, fan_chart
+    from .projections import PATHS, PERCENTILES, project
+
+    if overall_label not in LEVELS:
+        return None
+    assets = report_assets()
+    i = LEVELS.index(overall_label)
+    profile = profile_stats()[i]["profile"]
+    bands = project(profile, PROJECTION_YEARS)
+
+    intro = Paragraph(
+        f"What 100 invested in the <b>{profile}</b> profile could grow to over {PROJECTION_YEARS} years, "
+        f"from {PATHS:,} simulated return paths. The line is the median outcome, the dark band holds "
+        f"the middle half of outcomes and the light band {PERCENTILES[-1] - PERCENTILES[0]}% of them.",
+        assets.normal,
+    )
+    chart = fan_chart(bands, PALETTE[i % len(PALETTE)])
+    rows = [["After", f"{PERCENTILES[0]}th pct", f"{PERCENTILES[1]}th pct", "Median",
+             f"{PERCENTILES[3]}th pct", f"{PERCENTILES[4]}th pct"]]
+    years = [y for y in PROJECTION_MILESTONES if y < PROJECTION_YEARS] + [PROJECTION_YEARS]
+    for y in years:
+        rows.append([f"{y} year" + ("s" if y > 1 else "")] + [f"{v:.0f}" for v in bands[:, y]])
+    table = Table(rows, colWidths=[70] + [76] * 5)
+    table.setStyle(assets.projection_style)
+    return intro, chart, table
+
+
+def _shared(flowable):
+    # Flowables keep layout state (wrap sizes, split parts) on themselves while
+    # a document is built, so each report gets its own shallow copy.
+    return copy.copy(flowable)
+
+
+def _shared_drawing(drawing):
+    # Rendering a Drawing also tags every shape with its parent, so the shapes
+    # are copied too (Drawing.copy() would still share them)
+    clone = copy.copy(drawing)
+    clone.contents = [copy.copy(shape) for shape in drawing.contents]
+    return clone
+
+
+# --- PDF Generator --------------------------------------------------------------
+def _qa_boxes(answers, assets):
+    from xml.sax.saxutils import escape
+
+    from reportlab.platypus import Paragraph, Spacer, Table
+
+    elements = []
+    for i, (q, a) in enumerate(answers, 1):
+        qa_table = Table(
+            [[Paragraph(f"<b>Q{i}.</b> {escape(q)}", assets.normal)],
+             [Paragraph(f"<i>Answer:</i> {escape(a)}", assets.normal)]],
+            colWidths=[450]
+        )
+        qa_table.setStyle(assets.qa_style)
+        elements.append(qa_table)
+        elements.append(Spacer(1, 6))
+    return elements
+
+
+@metrics.timed("generate_pdf")
+def generate_pdf(tol_total, tol_level, tol_desc, cap_total, cap_level, cap_desc,
+                 msg, overall_label, tol_answers, cap_answers, client_name, client_email, out=None):
+    """Build the client's report.
+
+    Returns the PDF bytes; with `out` (a binary stream or a writable buffer,
+    see pdf_output.py) the PDF is written there and its size returned.
+    """
+    # saxutils is imported here rather than at the top: it pulls in urllib,
+    # email and http.client, which would slow every import of risk_core
+    from xml.sax.saxutils import escape
+
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, PageBreak
+
+    assets = report_assets()
+    normal = assets.normal
+
+    target = pdf_output.writer(out)
+    doc = SimpleDocTemplate(
+        target,
+        pagesize=A4,
+        title="Risk Profile Report",
+        leftMargin=18*mm,
+        rightMargin=18*mm,
+        topMargin=18*mm,
+        bottomMargin=18*mm,
+    )
+
+    elements = [
+        # Paragraph text is markup, so plain text from outside is escaped
+        Paragraph(f"Client Risk Profile Report: {escape(client_name)}", assets.title),
+        Spacer(1, 20),
+    ]
+
+    # --- Summary table
+    data = [
+        ["Category", "Score (0–40)", "Level", "Description"],
+        [
+            "Risk Tolerance",
+            f"{tol_total}/40",
+            Paragraph(tol_level, normal),
+            Paragraph(tol_desc, normal),
+        ],
+        [
+            "Risk Capacity",
+            f"{cap_total}/40",
+            Paragraph(cap_level, normal),
+            Paragraph(cap_desc, normal),
+        ],
+    ]
+
+    t = Table(data, colWidths=[85, 85, 95, 190])
+    t.setStyle(assets.summary_style)
+    elements.append(t)
+
+    # Space below the summary table
+    elements.append(Spacer(1, 14))
+
+    # Show the explanatory message as a full-width, styled box
+    msg_table = Table([[Paragraph(msg, normal)]], colWidths=[455])
+    msg_table.setStyle(assets.msg_style)
+    elements.append(msg_table)
+
+    # Space above the Risk & Return section
+    elements.append(Spacer(1, 18))
+
+    # --- Risk & Return Profiles
+    elements.append(_shared(assets.profiles_heading))
+    elements.append(_shared(assets.profiles_table))
+
+    elements.append(Spacer(1, 50))  # try 50; adjust up/down for more or less gap
+
+    # --- Box & Whisker chart (centered & well spaced), client's profile highlighted
+    chart = assets.charts.get(overall_label, assets.charts[None])
+    img_table = Table([[_shared_drawing(chart)]], colWidths=[440])
+    img_table.setStyle(assets.chart_style)
+    elements.append(img_table)
+
+    # gentle space below the chart before the next section
+    elements.append(Spacer(1, 35))
+
+    # --- Growth projection for the client's profile
+    projection = projection_assets(overall_label)
+    if projection is not None:
+        intro, chart, table = projection
+        elements.append(PageBreak())
+        elements.append(_shared(assets.projection_heading))
+        elements.append(_shared(intro))
+        elements.append(Spacer(1, 12))
+        chart_table = Table([[_shared_drawing(chart)]], colWidths=[440])
+        chart_table.setStyle(assets.chart_style)
+        elements.append(chart_table)
+        elements.append(_shared(table))
+        elements.append(Spacer(1, 14))
+        elements.append(_shared(assets.projection_note))
+
+    # --- Answers (boxed layout)
+    elements.append(PageBreak())
+    elements.append(_shared(assets.tolerance_heading))
+    elements.extend(_qa_boxes(tol_answers, assets))
+
+    elements.append(PageBreak())
+    elements.append(_shared(assets.capacity_heading))
+    elements.extend(_qa_boxes(cap_answers, assets))
+
+    # --- Notes (on same page, spacing only) --------------------------
+    # start with a big spacer, adjust this value
+    elements.append(Spacer(1, 100))  # try 100 first; increase until it sits near bottom
+    elements.append(_shared(assets.notes))
+
+    with metrics.span("doc_build"):
+        doc.build(elements)
+    metrics.inc("reports_generated_total")
+    metrics.inc("pdf_bytes_total", target.size)
+    return target.data if out is None else target.size
+
+
+def build_report(client_name, client_email, tol_idx, cap_idx, version=QUESTIONNAIRE_VERSION, out=None):
+    """Score stored answer indices and build the PDF the app would offer.
+
+    Answers are read and scored with the questionnaire `version` they were given
+    for. `out` is passed on to generate_pdf.
+    """
+    questionnaire = load(version)
+    tol_answers = [(q.prompt, q.options[i]) for q, i in zip(questionnaire["tol"].questions, tol_idx)]
+    cap_answers = [(q.prompt, q.options[i]) for q, i in zip(questionnaire["cap"].questions, cap_idx)]
+    r = score_answers(tol_idx, cap_idx, version)
+    return generate_pdf(
+        r["tol_total"], r["tol_level"], r["tol_desc"],
+        r["cap_total"], r["cap_level"], r["cap_desc"],
+        r["message"], r["overall_label"],
+        tol_answers, cap_answers,
+        client_name, client_email, out
+    )
@@ -0,0 +1,83 @@
+# Process-wide cache of generated PDF reports
+# ------------------------------------------------------------------------
+# Streamlit re-executes app.py on every interaction, so anything defined there
+# is rebuilt per rerun. This module is imported once per server process, which
+# makes the cache below shared by every session.
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from . import metrics
+
+
+def report_key(client_name, client_email, tol_answers, cap_answers, version):
+    """Stable content hash of everything that determines a report's bytes."""
+    payload = json.dumps(
+        [version, client_name, client_email, tol_answers, cap_answers],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """Thread-safe LRU cache of PDF bytes with a time-to-live per entry."""
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, ttl=60 * 60):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (expires_at, pdf bytes)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, count_miss=True):
+        """The cached PDF or None; count_miss=False leaves recording a miss to the caller."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += count_miss
+                return None
+            expires_at, pdf = entry
+            if expires_at < time.monotonic():
+                self._drop(key)
+                self.misses += count_miss
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pdf
+
+    def put(self, key, pdf):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, pdf)
+            self._size += len(pdf)
+            # Evict least recently used entries until both bounds hold
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._size > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def _drop(self, key):
+        _, pdf = self._entries.pop(key)
+        self._size -= len(pdf)
+
+
+# Single instance shared by all sessions in this process
+report_cache = ReportCache()
+
+metrics.gauge("report_cache_hits_total", lambda: report_cache.hits, kind="counter")
+metrics.gauge("report_cache_misses_total", lambda: report_cache.misses, kind="counter")
+metrics.gauge("report_cache_entries", lambda: len(report_cache))
@@ -0,0 +1,40 @@
+# Compact per-session answer record
+# ------------------------------------------------------------------------
+# One client's answers to a questionnaire version: the chosen option index of
+# every question in a signed-byte array (-1 = unanswered, questions of all
+# sections back to back) plus a bitmask of answered questions. Progress and
+# "section complete" are bit operations on the mask, so nothing has to rescan
+# session state, and a session holds a few dozen bytes instead of the option
+# strings.
+from array import array
+
+
+class Responses:
+    __slots__ = ("version", "indices", "answered")
+
+    def __init__(self, questionnaire):
+        self.version = questionnaire.version
+        self.indices = array("b", [-1]) * questionnaire.size
+        self.answered = 0
+
+    def set(self, position, index):
+        """Record the option chosen for question `position`; None clears it."""
+        if index is None:
+            self.indices[position] = -1
+            self.answered &= ~(1 << position)
+        else:
+            self.indices[position] = index
+            self.answered |= 1 << position
+
+    @property
+    def count(self):
+        return self.answered.bit_count()
+
+    def complete(self, start, stop):
+        """True once every question in positions start..stop-1 is answered."""
+        mask = ((1 << (stop - start)) - 1) << start
+        return self.answered & mask == mask
+
+    def answers(self, start, stop):
+        """Option indices of positions start..stop-1 (-1 where unanswered)."""
+        return self.indices[start:stop].tolist()
@@ -0,0 +1,145 @@
+# Rolling-return statistics for the risk profiles
+# ------------------------------------------------------------------------
+# Recomputes the figures behind the report's Risk & Return section from daily
+# index prices instead of a hand-run notebook. Input is a local CSV with a date
+# column and one price-index column per asset class:
+#
+#   date,local_equity,global_equity,local_bonds
+#   2005-01-03,100.0,100.0,100.0
+#   ...
+#
+# Each profile is a daily-rebalanced blend (weights from the report Notes).
+# Its daily log returns are accumulated once, and every rolling one-year
+# return then falls out of a single vectorized difference of that cumulative
+# array. Results are cached on disk under RISK_CACHE_DIR (default
+# ~/.cache/risk_core), keyed by the SHA-256 of the input file and the
+# parameters, so a refresh only recomputes when the data changes.
+#
+#   python -m risk_core.returns prices.csv [--years 20] [-o stats.json]
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+ASSETS = ("local_equity", "global_equity", "local_bonds")
+
+# (profile, weights in ASSETS order) — matches the Notes paragraph of the report
+BLENDS = [
+    ("Conservative", (0.20, 0.10, 0.70)),
+    ("Mod. Conservative", (0.30, 0.15, 0.55)),
+    ("Moderate", (0.40, 0.20, 0.40)),
+    ("Mod. Aggressive", (0.50, 0.25, 0.25)),
+    ("Aggressive", (0.60, 0.30, 0.10)),
+]
+
+TRADING_DAYS = 252
+CACHE_DIR = os.environ.get("RISK_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "risk_core"))
+
+
+# --- Loading -------------------------------------------------------------------------
+def load_prices(path):
+    """Return (dates, prices) with prices shaped (days, len(ASSETS))."""
+    with open(path, encoding="utf-8") as f:
+        header = [h.strip() for h in f.readline().split(",")]
+    missing = [a for a in ("date",) + ASSETS if a not in header]
+    if missing:
+        raise ValueError(f"{path}: missing columns {', '.join(missing)}")
+    dates = np.loadtxt(path, delimiter=",", skiprows=1, usecols=header.index("date"), dtype=str, ndmin=1)
+    prices = np.loadtxt(path, delimiter=",", skiprows=1, usecols=[header.index(a) for a in ASSETS], ndmin=2)
+    order = np.argsort(dates, kind="stable")
+    return dates[order], prices[order]
+
+
+# --- Statistics --------------------------------------------------------------------
+def rolling_returns(prices, weights, window=TRADING_DAYS):
+    """Rolling `window`-day returns of a daily-rebalanced blend, plus its daily log returns."""
+    daily = prices[1:] / prices[:-1] - 1.0                  # (days-1, assets)
+    blend = np.log1p(daily @ np.asarray(weights))           # daily portfolio log returns
+    cumulative = np.concatenate(([0.0], np.cumsum(blend)))
+    return np.expm1(cumulative[window:] - cumulative[:-window]), blend
+
+
+def box_stats(values):
+    """Quartiles and Tukey whiskers (1.5 × IQR, clipped to the data), as a box plot draws them."""
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    low = values[values >= q1 - 1.5 * iqr].min()
+    high = values[values <= q3 + 1.5 * iqr].max()
+    return {
+        "q1": float(q1), "median": float(median), "q3": float(q3),
+        "whisker_low": float(low), "whisker_high": float(high),
+        "min": float(values.min()), "max": float(values.max()),
+    }
+
+
+def profile_stats(dates, prices, years=None, window=TRADING_DAYS):
+    if years:
+        keep = min(len(prices), int(years * TRADING_DAYS) + 1)
+        dates, prices = dates[-keep:], prices[-keep:]
+    if len(prices) <= window:
+        raise ValueError(f"need more than {window} daily prices, got {len(prices)}")
+
+    profiles = []
+    for name, weights in BLENDS:
+        rolling, daily = rolling_returns(prices, weights, window)
+        profiles.append({
+            "profile": name,
+            "weights": list(weights),
+            "mean": float(rolling.mean()),
+            "volatility": float(daily.std(ddof=1) * np.sqrt(TRADING_DAYS)),
+            "windows": int(rolling.size),
+            **box_stats(rolling),
+        })
+    return {"start": str(dates[0]), "end": str(dates[-1]), "window": window, "profiles": profiles}
+
+
+# --- Cached entry point ------------------------------------------------------------
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compute(path, years=None, window=TRADING_DAYS, cache_dir=CACHE_DIR):
+    """profile_stats() for a price CSV, reusing the on-disk result when the inputs match."""
+    params = json.dumps({"years": years, "window": window, "blends": BLENDS}, sort_keys=True)
+    key = hashlib.sha256((_file_hash(path) + params).encode()).hexdigest()[:32]
+    cache_path = os.path.join(cache_dir, f"returns-{key}.json")
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    stats = profile_stats(*load_prices(path), years=years, window=window)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+    os.replace(tmp, cache_path)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rolling one-year return statistics per risk profile.")
+    parser.add_argument("prices", help="CSV of daily index prices")
+    parser.add_argument("--years", type=float, help="only use the most recent N years")
+    parser.add_argument("-o", "--output", help="also write the statistics as JSON")
+    args = parser.parse_args(argv)
+
+    stats = compute(args.prices, years=args.years)
+    print(f"{stats['start']} to {stats['end']}, rolling {stats['window']}-day periods")
+    print(f"{'Profile':18s} {'Mean':>7s} {'Vol':>7s} {'Q1':>7s} {'Median':>7s} {'Q3':>7s} {'Low':>7s} {'High':>7s}")
+    for p in stats["profiles"]:
+        print(f"{p['profile']:18s} " + " ".join(
+            f"{p[k] * 100:6.1f}%" for k in ("mean", "volatility", "q1", "median", "q3", "whisker_low", "whisker_high")
+        ))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
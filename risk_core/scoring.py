@@ -0,0 +1,53 @@
+# Scoring and interpretation of questionnaire answers
+# ------------------------------------------------------------------------
+from .questionnaire import QUESTIONNAIRE_VERSION, load, risk_tolerance, risk_capacity
+
+# --- Scoring --------------------------------------------------------------------
+LEVELS = ["Conservative", "Moderately Conservative", "Moderate", "Moderately Aggressive", "Aggressive"]
+
+def option_score(idx: int) -> int:
+    """Legacy fixed scoring (first option 5 ... last 1), kept for existing callers.
+
+    Questionnaire definitions carry explicit per-option scores (Question.scores,
+    used by Section.score and score_answers); new code should use those.
+    """
+    return 5 - idx
+
+# Bands and descriptions live in the questionnaire definition
+def interpret_tolerance(score):
+    return risk_tolerance.interpret(score)
+
+def interpret_capacity(score):
+    return risk_capacity.interpret(score)
+
+
+def overall_message(tol, cap):
+    diff = abs(tol - cap)
+    if diff < 6:
+        return "Your tolerance and capacity are broadly aligned — your overall position looks appropriate."
+    elif tol > cap:
+        return "Your risk tolerance is higher than your financial capacity. Please discuss this with your advisor."
+    else:
+        return "Your financial capacity allows more risk than you currently feel comfortable taking. Review your goals."
+
+def combine_label(tol_level, cap_level):
+    order = LEVELS
+    t = next((o for o in order if tol_level.startswith(o)), "Moderate")
+    c = next((o for o in order if cap_level.startswith(o)), "Moderate")
+    # Return the lower (more conservative) of the two
+    return order[min(order.index(t), order.index(c))]
+
+
+def score_answers(tol_idx, cap_idx, version=QUESTIONNAIRE_VERSION):
+    """Score option indices against the questionnaire version they were answered with."""
+    questionnaire = load(version)
+    tol, cap = questionnaire["tol"], questionnaire["cap"]
+    tol_total, cap_total = tol.score(tol_idx), cap.score(cap_idx)
+    tol_level, tol_desc = tol.interpret(tol_total)
+    cap_level, cap_desc = cap.interpret(cap_total)
+    return {
+        "tol_total": tol_total, "tol_level": tol_level, "tol_desc": tol_desc,
+        "cap_total": cap_total, "cap_level": cap_level, "cap_desc": cap_desc,
+        "message": overall_message(tol_total, cap_total),
+        "overall_label": combine_label(tol_level, cap_level),
+    }
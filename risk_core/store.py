@@ -0,0 +1,230 @@
+# Durable submission store (SQLite, WAL mode)
+# ------------------------------------------------------------------------
+# Every completed questionnaire is kept as one row: client details, the chosen
+# option index per question (tol_0.., cap_0.., the same names batch_scoring.py
+# reads), totals, levels, the combined label and the questionnaire version.
+# Records carrying a session id are one row per questionnaire run, i.e. per
+# (app session, client email): a later record of the same run (answers changed
+# after finishing) replaces the row, and its old contribution is taken back out
+# of the analytics aggregates. An advisor who goes on to a second client in the
+# same browser tab gets a second row.
+#
+# The app never writes directly. SubmissionWriter queues records and a single
+# background thread commits them in batches, so a rerun only pays for a
+# queue.put. Indexes on (client_email, submitted_at) and submitted_at keep
+# advisor lookups and time-range exports logarithmic in the table size. The
+# advisor analytics aggregates are updated in the same transaction. A batch
+# that fails with an operational error (e.g. "database is locked") is retried
+# with backoff; a record the database rejects is dropped on its own.
+#
+# The database path comes from RISK_DB_PATH (default: submissions.db).
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from . import analytics, metrics
+from .questionnaire import risk_tolerance, risk_capacity
+
+DB_PATH = os.environ.get("RISK_DB_PATH", "submissions.db")
+
+TOL_FIELDS = [f"tol_{i}" for i in range(len(risk_tolerance.questions))]
+CAP_FIELDS = [f"cap_{i}" for i in range(len(risk_capacity.questions))]
+COLUMNS = (
+    ["submitted_at", "questionnaire_version", "client_name", "client_email"]
+    + TOL_FIELDS + CAP_FIELDS
+    + ["tol_total", "tol_level", "cap_total", "cap_level", "overall_label", "session_id"]
+)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    submitted_at REAL NOT NULL,
+    questionnaire_version TEXT NOT NULL,
+    client_name TEXT NOT NULL,
+    client_email TEXT NOT NULL,
+    {", ".join(f"{f} INTEGER NOT NULL" for f in TOL_FIELDS + CAP_FIELDS)},
+    tol_total INTEGER NOT NULL,
+    tol_level TEXT NOT NULL,
+    cap_total INTEGER NOT NULL,
+    cap_level TEXT NOT NULL,
+    overall_label TEXT NOT NULL,
+    session_id TEXT                 -- app session that made it; NULL for imported rows
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_email ON submissions (client_email, submitted_at);
+CREATE INDEX IF NOT EXISTS idx_submissions_time ON submissions (submitted_at);
+"""
+
+log = logging.getLogger(__name__)
+
+_INSERT = (
+    f"INSERT INTO submissions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+    " ON CONFLICT (session_id, client_email) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in COLUMNS if c not in ("session_id", "client_email"))
+)
+_SESSION = COLUMNS.index("session_id")
+_EMAIL = COLUMNS.index("client_email")
+
+RETRY_LIMIT = 10        # attempts at a batch that keeps failing with an operational error
+RETRY_BASE = 0.1        # seconds before the first retry, doubling up to RETRY_MAX
+RETRY_MAX = 10.0
+
+# Bumped whenever the schema gains tables that need backfilling
+SCHEMA_VERSION = 3
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")   # durable across app crashes; fine with WAL
+    conn.executescript(SCHEMA)
+    if "session_id" not in {row["name"] for row in conn.execute("PRAGMA table_info(submissions)")}:
+        conn.execute("ALTER TABLE submissions ADD COLUMN session_id TEXT")     # databases before version 3
+    # One row per questionnaire run; the session-only index of earlier
+    # databases made a second client in the same tab replace the first
+    conn.execute("DROP INDEX IF EXISTS idx_submissions_session")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_submissions_run ON submissions (session_id, client_email)")
+    conn.executescript(analytics.SCHEMA)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < SCHEMA_VERSION:
+        # Databases from before the analytics tables existed: backfill once
+        analytics.rebuild(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+def make_record(client_name, client_email, tol_idx, cap_idx,
+                tol_total, tol_level, cap_total, cap_level, overall_label, version,
+                submitted_at=None, session_id=None):
+    return (
+        time.time() if submitted_at is None else submitted_at, version, client_name, client_email,
+        *tol_idx, *cap_idx,
+        tol_total, tol_level, cap_total, cap_level, overall_label, session_id,
+    )
+
+
+def save(conn, records):
+    """Insert records, replacing earlier rows of the same run, and update the aggregates.
+
+    Must run inside a transaction.
+    """
+    latest = {}
+    for i, record in enumerate(records):
+        # Within a batch only a run's last record counts
+        run = (record[_SESSION], record[_EMAIL]) if record[_SESSION] is not None else ("row", i)
+        latest[run] = record
+    records = list(latest.values())
+    runs = [(r[_SESSION], r[_EMAIL]) for r in records if r[_SESSION] is not None]
+    if runs:
+        replaced = conn.execute(
+            "SELECT * FROM submissions WHERE (session_id, client_email) IN "
+            f"(VALUES {', '.join(['(?, ?)'] * len(runs))})",
+            [v for run in runs for v in run],
+        ).fetchall()
+        analytics.apply(conn, [dict(row) for row in replaced], sign=-1)
+    conn.executemany(_INSERT, records)
+    analytics.apply(conn, [dict(zip(COLUMNS, record)) for record in records])
+    return len(records)
+
+
+# --- Batched background writer ---------------------------------------------------
+class SubmissionWriter:
+    def __init__(self, path=DB_PATH, batch_size=500, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="submission-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        """Queue a record from make_record(); never blocks on disk."""
+        self._queue.put(record)
+
+    def flush(self):
+        """Block until everything queued so far is committed."""
+        self._queue.join()
+
+    def _run(self):
+        conn = None
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                conn = self._store(conn, batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _store(self, conn, batch):
+        """Commit a batch and return the connection to keep using."""
+        for attempt in range(1, RETRY_LIMIT + 1):
+            try:
+                if conn is None:
+                    conn = connect(self.path)
+                with conn:
+                    save(conn, batch)
+                metrics.inc("submissions_saved_total", len(batch))
+                return conn
+            except sqlite3.OperationalError as exc:
+                # Locked, busy or I/O trouble passes; wait and try the same batch again
+                if attempt == RETRY_LIMIT:
+                    log.error("giving up on %d submissions after %d attempts: %s", len(batch), attempt, exc)
+                    return conn
+                delay = min(RETRY_MAX, RETRY_BASE * 2 ** (attempt - 1))
+                log.warning("storing %d submissions failed (%s); retrying in %.1f s", len(batch), exc, delay)
+                time.sleep(delay)
+            except sqlite3.Error:
+                # The database rejects something in this batch: store the
+                # records one by one so only the bad ones are lost
+                if len(batch) == 1:
+                    log.exception("failed to store a submission")
+                    return conn
+                for record in batch:
+                    conn = self._store(conn, [record])
+                return conn
+        return conn
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """The process-wide writer, started on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = SubmissionWriter()
+            atexit.register(_writer.flush)
+        return _writer
+
+
+# --- Lookups ------------------------------------------------------------------------
+def find_by_email(conn, client_email, limit=100):
+    return conn.execute(
+        "SELECT * FROM submissions WHERE client_email = ? ORDER BY submitted_at DESC LIMIT ?",
+        (client_email, limit),
+    ).fetchall()
+
+
+def iter_between(conn, start, end, batch_size=10_000):
+    """Yield submissions with start <= submitted_at < end, oldest first."""
+    cur = conn.execute(
+        "SELECT * FROM submissions WHERE submitted_at >= ? AND submitted_at < ? ORDER BY submitted_at",
+        (start, end),
+    )
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
@@ -0,0 +1,80 @@
+import io
+
+import numpy as np
+import pytest
+
+from risk_core.batch_scoring import (
+    CAP_FIELDS, N_OPTIONS, TOL_FIELDS, ScoringMismatch, check, mismatches, score_file, score_indices,
+)
+from risk_core.questionnaire import available_versions
+
+VERSIONS = available_versions()
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+@pytest.mark.parametrize("seed", range(5))
+def test_random_sheets_match_score_answers(version, seed):
+    rng = np.random.default_rng(seed)
+    tol_idx = rng.integers(0, N_OPTIONS, (2_000, len(TOL_FIELDS)))
+    cap_idx = rng.integers(0, N_OPTIONS, (2_000, len(CAP_FIELDS)))
+    assert mismatches(tol_idx, cap_idx, version) == []
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+@pytest.mark.parametrize("tol_option", range(N_OPTIONS))
+@pytest.mark.parametrize("cap_option", range(N_OPTIONS))
+def test_uniform_sheets_match_score_answers(version, tol_option, cap_option):
+    # Every answer on the same option reaches the extreme totals and band edges
+    tol_idx = np.full((1, len(TOL_FIELDS)), tol_option)
+    cap_idx = np.full((1, len(CAP_FIELDS)), cap_option)
+    assert mismatches(tol_idx, cap_idx, version) == []
+
+
+def test_check_passes():
+    assert check(samples=500, seed=1) > 500
+
+
+def test_check_raises_on_mismatch(monkeypatch):
+    import risk_core.batch_scoring as batch_scoring
+
+    def off_by_one(tol_idx, cap_idx, version):
+        res = score_indices(tol_idx, cap_idx, version)
+        res["tol_total"] = res["tol_total"] + 1
+        return res
+
+    monkeypatch.setattr(batch_scoring, "score_indices", off_by_one)
+    with pytest.raises(ScoringMismatch, match="tol_total"):
+        check(samples=10)
+
+
+
+def _write_csv(path, rows, version=None):
+    header = ["id"] + TOL_FIELDS + CAP_FIELDS + (["questionnaire_version"] if version else [])
+    lines = [",".join(header)] + [",".join([rid] + cells + ([version] if version else [])) for rid, cells in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_empty_and_two_digit_cells_do_not_shift_answers(tmp_path):
+    # The lengths of "" and "12" cancel out, which once let the single-character
+    # fast path decode the chunk with every answer between them shifted
+    zeros = ["0"] * (len(TOL_FIELDS) + len(CAP_FIELDS))
+    path = tmp_path / "responses.csv"
+    _write_csv(path, [("r1", zeros), ("r2", [""] + zeros[1:]), ("r3", zeros), ("r4", ["12"] + zeros[1:])])
+    with pytest.raises(ValueError, match="^row 2: missing or non-integer answer"):
+        score_file(str(path), io.StringIO())
+
+
+def test_two_digit_cell_is_range_checked(tmp_path):
+    zeros = ["0"] * (len(TOL_FIELDS) + len(CAP_FIELDS))
+    path = tmp_path / "responses.csv"
+    _write_csv(path, [("r1", zeros), ("r2", ["12"] + zeros[1:])])
+    with pytest.raises(ValueError, match="^row 2: answer index outside"):
+        score_file(str(path), io.StringIO())
+
+
+def test_unknown_version_names_the_row(tmp_path):
+    zeros = ["0"] * (len(TOL_FIELDS) + len(CAP_FIELDS))
+    path = tmp_path / "responses.csv"
+    _write_csv(path, [("r1", zeros)], version="no-such-version")
+    with pytest.raises(ValueError, match="^row 1: unknown questionnaire version 'no-such-version'"):
+        score_file(str(path), io.StringIO())
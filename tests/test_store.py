@@ -0,0 +1,93 @@
+import sqlite3
+
+import pytest
+
+from risk_core import analytics, store
+from risk_core.questionnaire import QUESTIONNAIRE_VERSION, risk_capacity, risk_tolerance
+from risk_core.scoring import combine_label
+
+AGG_TABLES = ("agg_totals", "agg_levels", "agg_options", "agg_daily")
+
+
+def _record(email, option, session_id="S1", submitted_at=1_700_000_000.0):
+    tol_idx = [option] * len(risk_tolerance.questions)
+    cap_idx = [option] * len(risk_capacity.questions)
+    tol_total, cap_total = risk_tolerance.score(tol_idx), risk_capacity.score(cap_idx)
+    tol_level, _ = risk_tolerance.interpret(tol_total)
+    cap_level, _ = risk_capacity.interpret(cap_total)
+    return store.make_record(
+        "Client", email, tol_idx, cap_idx, tol_total, tol_level, cap_total, cap_level,
+        combine_label(tol_level, cap_level), QUESTIONNAIRE_VERSION,
+        submitted_at=submitted_at, session_id=session_id,
+    )
+
+
+def _aggregates(conn):
+    return {t: sorted(map(tuple, conn.execute(f"SELECT * FROM {t}"))) for t in AGG_TABLES}
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = store.connect(str(tmp_path / "submissions.db"))
+    yield conn
+    conn.close()
+
+
+def _save(conn, *records):
+    with conn:
+        store.save(conn, list(records))
+
+
+def _assert_aggregates_match_rebuild(conn):
+    incremental = _aggregates(conn)
+    with conn:
+        analytics.rebuild(conn)
+    assert incremental == _aggregates(conn)
+
+
+def test_changed_answers_replace_the_row_and_its_aggregates(conn):
+    _save(conn, _record("a@example.com", 0))
+    _save(conn, _record("a@example.com", 4, submitted_at=1_800_000_000.0))
+    rows = conn.execute("SELECT tol_0, client_email FROM submissions").fetchall()
+    assert [tuple(r) for r in rows] == [(4, "a@example.com")]
+    # The first answers were subtracted, not just outnumbered
+    assert conn.execute("SELECT count(*) FROM agg_options WHERE option = 0").fetchone()[0] == 0
+    assert conn.execute("SELECT count(*) FROM agg_daily").fetchone()[0] == 1
+    _assert_aggregates_match_rebuild(conn)
+
+
+def test_next_client_in_the_same_session_gets_their_own_row(conn):
+    _save(conn, _record("a@example.com", 0))
+    _save(conn, _record("b@example.com", 2))
+    _save(conn, _record("b@example.com", 3))
+    rows = conn.execute("SELECT client_email, tol_0 FROM submissions ORDER BY client_email").fetchall()
+    assert [tuple(r) for r in rows] == [("a@example.com", 0), ("b@example.com", 3)]
+    assert analytics.dashboard(conn)["submissions"] == 2
+    _assert_aggregates_match_rebuild(conn)
+
+
+def test_last_record_of_a_run_wins_within_a_batch(conn):
+    _save(conn, _record("a@example.com", 0), _record("b@example.com", 1), _record("a@example.com", 2))
+    rows = conn.execute("SELECT client_email, tol_0 FROM submissions ORDER BY client_email").fetchall()
+    assert [tuple(r) for r in rows] == [("a@example.com", 2), ("b@example.com", 1)]
+    _assert_aggregates_match_rebuild(conn)
+
+
+def test_records_without_a_session_are_never_replaced(conn):
+    _save(conn, _record("a@example.com", 0, session_id=None), _record("a@example.com", 1, session_id=None))
+    _save(conn, _record("a@example.com", 2, session_id=None))
+    assert conn.execute("SELECT count(*) FROM submissions").fetchone()[0] == 3
+    _assert_aggregates_match_rebuild(conn)
+
+
+def test_session_only_index_of_older_databases_is_replaced(tmp_path):
+    path = str(tmp_path / "submissions.db")
+    store.connect(path).close()
+    with sqlite3.connect(path) as old:
+        old.execute("DROP INDEX idx_submissions_run")
+        old.execute("CREATE UNIQUE INDEX idx_submissions_session ON submissions (session_id)")
+    conn = store.connect(path)
+    _save(conn, _record("a@example.com", 0))
+    _save(conn, _record("b@example.com", 1))
+    assert conn.execute("SELECT count(*) FROM submissions").fetchone()[0] == 2
+    conn.close()